@@ -5,11 +5,25 @@ from user.data import DTL_REGION
 from user.user_loc import getLocation, get_address_name
 from user.user_vector import genre_vector
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import json
-from config import NARU_API_KEY, KAKAO_REST_API_KEY
+import threading
+from config import NARU_API_KEY, KAKAO_REST_API_KEY, TREND_SNAPSHOT_MAX_AGE
+from config import LIBRARY_DIRECTORY_MAX_AGE, LIBRARY_SEARCH_RADIUS_M
 import os
 import user.data as code_data
 from user.map import astar_find_nearest_library
+from user.api_cache import get_book_cache, make_cache_key
+from user import http_client
+from user.book_pager import BookPager
+from user.query_plan import plan_queries, merge_ranked
+from user.trend_store import get_trend_store, profile_key
+from user.region_resolver import resolve_region_codes, address_to_region_codes
+from user.session_memo import session_memo
+from user.library_directory import get_library_directory, naru_fetcher as library_fetcher
+
+# 이번 실행(rerun)의 외부 API 호출 수 집계
+rerun_calls = http_client.start_call_tracking()
 
 # -----------------------------
 # 초기 세션 상태
@@ -31,13 +45,61 @@ REGION_REVERSE = {v: k for k, v in code_data.REGION.items()}
 DTL_REGION_REVERSE = {v: k for k, v in code_data.DTL_REGION.items()}
 genres = code_data.DTL_KDC
 
+# 소장 도서관 동시 조회 수 (정보나루 호출 한도 보호)
+HOLDINGS_MAX_WORKERS = 4
+
+# 한 번의 실행(rerun)에서 소장 여부(bookExist)를 확인할 최대 도서관 수 (모든 도서 공통, 가까운 순)
+HOLDINGS_MAX_LIBRARIES = 20
+
+# 이번 실행(rerun)에서 남은 bookExist 확인 수 (스크립트가 다시 실행될 때마다 새로 채워짐)
+holdings_budget = {"remaining": HOLDINGS_MAX_LIBRARIES}
+holdings_budget_lock = threading.Lock()
+
+# 경로 페이지에 넘길 가까운 소장 도서관 수 (보행 거리 재정렬 후보)
+NEAREST_LIBRARIES = 10
+
+# 추천 도서 페이지 크기 (첫 화면은 첫 페이지만 기다림)
+BOOK_PAGE_SIZE = 10
+
+# 정보나루 응답 디스크 캐시 (재실행·세션 간 같은 인스턴스)
+book_cache = get_book_cache()
+
+# 인기대출도서 오프라인 스냅샷 (python -m user.trend_store 로 수집)
+trend_store = get_trend_store()
+
+# 전국 도서관 목록 (python -m user.library_directory 로 갱신, 오래되면 백그라운드에서 한 번 갱신)
+library_directory = get_library_directory(library_fetcher(NARU_API_KEY), LIBRARY_DIRECTORY_MAX_AGE)
+
 # ---------------------------
 # 도서 조회 함수
 # ---------------------------
-def get_popular_books(user_prefs):
+def get_popular_books(user_prefs, page_no=1, page_size=20):
     """
     사용자 선호도를 기반으로 인기 도서 조회
+
+    Args:
+        user_prefs: 사용자 선호도 dict
+        page_no: 페이지 번호 (1부터)
+        page_size: 한 페이지의 도서 수
     """
+    # 오프라인 스냅샷 규칙
+    # - 최신 스냅샷이 있으면 API를 호출하지 않고 해당 페이지를 반환
+    #   (top-K를 넘는 페이지는 빈 페이지 = 마지막 페이지)
+    # - 스냅샷이 없거나 오래됐을 때(lookup이 None)만 API 호출
+    snapshot = trend_store.lookup(
+        profile_key(
+            user_prefs.get("gender"),
+            user_prefs.get("age"),
+            user_prefs.get("kdc"),
+            user_prefs.get("dtl_kdc"),
+        ),
+        page_no,
+        page_size,
+        max_age=TREND_SNAPSHOT_MAX_AGE,
+    )
+    if snapshot is not None:
+        return snapshot, None
+
     # API URL
     base_url = "http://data4library.kr/api/loanItemSrch"
 
@@ -49,8 +111,8 @@ def get_popular_books(user_prefs):
     params = {
         "authKey": NARU_API_KEY,
         "format": "json",
-        "pageNo": 1,
-        "pageSize": 20,  # 한 번에 가져올 도서 수
+        "pageNo": page_no,
+        "pageSize": page_size,  # 한 번에 가져올 도서 수
     }
 
     # 사용자 선호도 추가
@@ -70,23 +132,20 @@ def get_popular_books(user_prefs):
     params["startDt"] = start_date.strftime("%Y-%m-%d")
     params["endDt"] = end_date.strftime("%Y-%m-%d")
 
-    try:
+    def fetch():
         # API 요청
-        response = requests.get(base_url, params=params, timeout=10)
+        response = http_client.get(base_url, params=params, timeout=10)
         response.raise_for_status()
+        return response.json()
 
-        # JSON 파싱
-        if response.status_code != 200:
-            st.error(f"API 오류: {response.status_code}")
-            st.text(response.text)
-            return
+    def is_valid(data):
+        # 오류 응답은 캐시하지 않음
+        return "response" in data and "docs" in data["response"]
 
-        try:
-            data = response.json()
-        except ValueError:
-            st.error("JSON 파싱 실패")
-            st.text(response.text)
-            return
+    try:
+        # 캐시 우선 조회 (동일 프로필 + 날짜 구간이면 재사용)
+        cache_key = make_cache_key("loanItemSrch", params)
+        data = book_cache.get_or_fetch(cache_key, fetch, cacheable=is_valid)
 
         # 응답 데이터 확인
         if "response" in data and "docs" in data["response"]:
@@ -99,13 +158,75 @@ def get_popular_books(user_prefs):
         return [], "API 요청 시간 초과"
     except requests.exceptions.RequestException as e:
         return [], f"API 요청 실패: {str(e)}"
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, ValueError):
         return [], "응답 데이터 파싱 실패"
 
 
-def display_book_card(book, location):
+def get_weighted_popular_books(user_prefs, page_no=1, page_size=20):
+    """
+    선택한 KDC / 세부 장르별로 인기 도서를 동시에 조회하고 가중 점수로 합치기
+
+    Args:
+        user_prefs: 사용자 선호도 dict (kdc, genre는 가중치 dict)
+        page_no: 페이지 번호 (1부터)
+        page_size: 질의별 페이지 크기
+
+    Returns:
+        tuple: (도서 리스트, 에러 메시지)
+    """
+    queries = plan_queries(user_prefs)
+
+    base_prefs = {k: v for k, v in user_prefs.items() if k not in ("kdc", "dtl_kdc")}
+
+    # 질의 수만큼 동시에 요청 (소요 시간은 가장 느린 질의 1회 수준)
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = [
+            (http_client.submit(executor, get_popular_books, {**base_prefs, **params}, page_no, page_size), weight)
+            for params, weight in queries
+        ]
+
+    results = []
+    errors = []
+    for future, weight in futures:
+        books, error = future.result()
+        if error:
+            errors.append(error)
+        else:
+            results.append((books, weight))
+
+    # 모든 질의가 실패한 경우에만 오류 처리
+    if not results:
+        return [], errors[0] if errors else None
+
+    return merge_ranked(results), None
+
+
+def get_book_pager(user_prefs):
+    """
+    사용자 선호도별 도서 페이저 (세션 내 재사용)
+
+    선호도가 바뀌면 새 페이저를 만들고, 같으면 이미 받은 페이지를 그대로 사용
+    """
+    def create_pager():
+        st.session_state.book_extra_count = 0
+        return BookPager(
+            lambda page_no, page_size: get_weighted_popular_books(user_prefs, page_no, page_size),
+            page_size=BOOK_PAGE_SIZE,
+            key=lambda book: book.get("doc", {}).get("isbn13") or id(book),
+        )
+
+    profile = {k: user_prefs.get(k) for k in ("gender", "age", "kdc", "dtl_kdc", "genre")}
+    return session_memo("book_pager", profile, create_pager)
+
+
+def display_book_card(book, location, holdings=None):
     """
     도서 정보를 카드 형태로 표시
+
+    Args:
+        book: 도서 정보
+        location: 사용자 위치
+        holdings: 미리 조회한 지역 소장 도서관 결과 (전체 libraries, error) 또는 None
     """
     # 도서 정보 추출
     book_info = book.get("doc", {})
@@ -141,6 +262,14 @@ def display_book_card(book, location):
         else:
             st.markdown(f"📊 대출 {loan_count}회")
 
+        # 주변 소장 도서관 수 (미리 조회된 경우)
+        if holdings is not None:
+            libraries, _ = holdings
+            if libraries:
+                st.markdown(f"📍 주변 도서관 {len(libraries)}곳 소장")
+            else:
+                st.markdown("📍 주변 소장 도서관 없음")
+
         # 도서관 찾기 버튼
         if st.button(f"가까운 도서관 찾기", key=f"btn_{isbn13}"):
             if location:
@@ -149,6 +278,8 @@ def display_book_card(book, location):
                     "bookname": bookname,
                     "location": location
                 }
+                # 반경 안 도서관 소장 확인은 선택한 도서만 (미리 조회한 지역 검색 결과는 대체용으로 재사용)
+                st.session_state.user["library"] = find_nearby_libraries(isbn13, location, holdings)
                 st.switch_page("pages/a_star.py")
                 st.rerun()
 
@@ -158,20 +289,130 @@ def display_book_card(book, location):
     st.divider()
 
 
-def search_nearby_libraries(isbn, user_location, region, dtl_region):
+def library_has_book(isbn, lib_code):
+    """
+    도서관 한 곳의 도서 소장 여부 (정보나루 bookExist, 캐시 우선)
+
+    Returns:
+        bool: 소장 여부
+    """
+    # API URL
+    base_url = "http://data4library.kr/api/bookExist"
+
+    params = {
+        "authKey": NARU_API_KEY,
+        "isbn13": isbn,
+        "libCode": lib_code,
+        "format": "json",
+    }
+
+    def fetch():
+        response = http_client.get(base_url, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def is_valid(data):
+        # 오류 응답은 캐시하지 않음
+        return "response" in data and "result" in data["response"]
+
+    data = book_cache.get_or_fetch(make_cache_key("bookExist", params), fetch, cacheable=is_valid)
+    return data.get("response", {}).get("result", {}).get("hasBook") == "Y"
+
+
+def reserve_holdings_checks(count):
+    """
+    이번 실행의 bookExist 확인 한도에서 count개까지 예약
+
+    Returns:
+        int: 실제로 확인할 수 있는 도서관 수
+    """
+    with holdings_budget_lock:
+        granted = min(count, holdings_budget["remaining"])
+        holdings_budget["remaining"] -= granted
+    return granted
+
+
+def search_directory_libraries(isbn, user_location, radius=LIBRARY_SEARCH_RADIUS_M, max_workers=HOLDINGS_MAX_WORKERS):
+    """
+    전국 도서관 목록에서 반경 안의 도서관만 골라 소장 여부를 동시에 확인 (지역 경계와 무관)
+
+    확인하는 도서관 수는 이번 실행의 공통 한도(HOLDINGS_MAX_LIBRARIES) 안에서 가까운 순으로 정함
+
+    Args:
+        isbn: ISBN 번호
+        user_location: 사용자 위치 {'latitude': float, 'longitude': float}
+        radius: 검색 반경 (미터)
+        max_workers: 동시에 진행할 최대 요청 수
+
+    Returns:
+        list: 소장 도서관 리스트 (가까운 순, 조회에 실패한 도서관은 제외), 반경 안에 도서관이 없거나 한도를 다 썼으면 None
+    """
+    nearby = library_directory.within_radius(
+        user_location["latitude"], user_location["longitude"], radius
+    )
+    nearby = nearby[:reserve_holdings_checks(len(nearby))]
+    if not nearby:
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [http_client.submit(executor, library_has_book, isbn, library["libCode"]) for library in nearby]
+
+    # 한 곳의 조회 실패는 그 도서관만 건너뛰고 나머지 결과는 유지
+    owned = []
+    for library, future in zip(nearby, futures):
+        try:
+            if future.result():
+                owned.append(library)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"소장 여부 확인 실패 ({library['libCode']}): {e}")
+    return owned
+
+
+def search_nearby_libraries(isbn, user_location, region, dtl_region, region_result=None):
     """
     가까운 도서관에서 해당 도서 소장 여부 검색
 
+    전국 도서관 목록이 있으면 반경 안의 도서관을 직접 확인하고,
+    목록이 없거나 반경 안에 소장 도서관이 없으면 지역 코드 기준 검색(libSrchByBook)으로 대체
+
     Args:
         isbn: ISBN 번호
         user_location: 사용자 위치 {'latitude': float, 'longitude': float}
         region: 지역 코드
         dtl_region: 세부 지역 코드
+        region_result: 이미 조회한 지역 코드 기준 검색 결과 (있으면 대체 검색 시 재사용)
 
     Returns:
-        list: 도서관 정보 리스트
+        tuple: (가까운 NEAREST_LIBRARIES곳의 거리순 결과 리스트, 에러 메시지)
+    """
+    try:
+        owned = search_directory_libraries(isbn, user_location)
+    except (requests.exceptions.RequestException, ValueError):
+        owned = None
+
+    if not owned:
+        if region_result is None:
+            region_result = search_region_libraries(isbn, region, dtl_region)
+        owned, error = region_result
+        if error or not owned:
+            return region_result
+
+    # 경로 페이지에 넘길 가까운 k곳만 거리 결과로 만듦 (A* 휴리스틱)
+    return astar_find_nearest_library(user_location, owned, k=NEAREST_LIBRARIES), None
+
+
+def search_region_libraries(isbn, region, dtl_region):
     """
+    지역 코드 기준으로 해당 도서 소장 도서관 검색 (정보나루 libSrchByBook, 도서당 1회 호출)
 
+    Args:
+        isbn: ISBN 번호
+        region: 지역 코드
+        dtl_region: 세부 지역 코드
+
+    Returns:
+        tuple: (소장 도서관 전체 리스트 (정렬 전), 에러 메시지)
+    """
     # API URL
     base_url = "http://data4library.kr/api/libSrchByBook"
 
@@ -186,7 +427,7 @@ def search_nearby_libraries(isbn, user_location, region, dtl_region):
 
     try:
         # API 요청
-        response = requests.get(base_url, params=params, timeout=10)
+        response = http_client.get(base_url, params=params, timeout=10)
         response.raise_for_status()
 
         data = response.json()
@@ -216,10 +457,8 @@ def search_nearby_libraries(isbn, user_location, region, dtl_region):
                     "operatingTime": lib.get("operatingTime", "정보 없음")
                 })
 
-            # A* 알고리즘으로 거리 계산 및 정렬
-            sorted_libraries = astar_find_nearest_library(user_location, libraries)
-
-            return sorted_libraries, None
+            # 전체 소장 수를 유지하도록 그대로 반환 (거리 정렬은 경로 페이지로 넘길 때)
+            return libraries, None
 
         else:
             return [], "응답 데이터 형식이 올바르지 않습니다."
@@ -232,6 +471,56 @@ def search_nearby_libraries(isbn, user_location, region, dtl_region):
         return [], f"예상치 못한 오류: {str(e)}"
 
 
+def find_nearby_libraries(isbn, user_location, region_result=None):
+    """
+    선택한 도서의 소장 도서관 (전국 목록 반경 검색 우선, 세션 내 재사용)
+
+    Args:
+        isbn: ISBN 번호
+        user_location: 사용자 위치 {'latitude': float, 'longitude': float}
+        region_result: 미리 조회한 지역 코드 기준 검색 결과 (없으면 None)
+
+    Returns:
+        tuple: (도서관 리스트, 에러 메시지)
+    """
+    region_code = REGION_REVERSE.get(st.session_state.user.get("region"))
+    dtl_region_code = DTL_REGION_REVERSE.get(st.session_state.user.get("dtl_region"))
+    key = (isbn, region_code, dtl_region_code)
+
+    results = st.session_state.setdefault("nearby_libraries", {})
+    if key not in results:
+        results[key] = search_nearby_libraries(isbn, user_location, region_code, dtl_region_code, region_result)
+    return results[key]
+
+
+def prefetch_nearby_libraries(isbns, region, dtl_region, max_workers=HOLDINGS_MAX_WORKERS):
+    """
+    여러 도서의 소장 도서관을 동시에 조회 (지역 코드 기준 검색만, 도서당 1회 호출)
+
+    반경 안 도서관별 소장 확인(bookExist)은 호출이 많아 도서를 선택했을 때만 실행
+
+    Args:
+        isbns: ISBN 번호 리스트
+        region: 지역 코드
+        dtl_region: 세부 지역 코드
+        max_workers: 동시에 진행할 최대 요청 수
+
+    Returns:
+        dict: {isbn: (소장 도서관 전체 리스트, 에러 메시지)}
+    """
+    unique_isbns = list(dict.fromkeys(isbn for isbn in isbns if isbn))
+    if not unique_isbns:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            isbn: http_client.submit(executor, search_region_libraries, isbn, region, dtl_region)
+            for isbn in unique_isbns
+        }
+
+    return {isbn: future.result() for isbn, future in futures.items()}
+
+
 
 
 # -----------------------------
@@ -431,23 +720,37 @@ elif st.session_state.step == 6:
     location = getLocation()
 
     if location:
-        address = get_address_name(
-            location["latitude"],
-            location["longitude"],
-            KAKAO_REST_API_KEY
+        # 행정구역 경계로 오프라인 변환, 경계 파일이 없거나 못 찾으면 카카오 주소로 변환
+        def resolve_location():
+            codes = resolve_region_codes(location["latitude"], location["longitude"])
+            if codes[0] is None:
+                address = get_address_name(
+                    location["latitude"],
+                    location["longitude"],
+                    KAKAO_REST_API_KEY
+                )
+                codes = address_to_region_codes(address)
+            return codes
+
+        # 위치가 그대로면 재실행 시 다시 변환하지 않음
+        region_code, dtl_region_code = session_memo(
+            "region_codes",
+            [location["latitude"], location["longitude"]],
+            resolve_location,
         )
-        addr1, addr2, addr3 = address.split()
         st.session_state.user["lat"] = location["latitude"]
         st.session_state.user["lng"] = location["longitude"]
-        st.session_state.user["region"] = addr1
-        st.session_state.user["dtl_region"] = addr1+" "+ addr2
+        st.session_state.user["region"] = code_data.REGION.get(region_code)
+        st.session_state.user["dtl_region"] = code_data.DTL_REGION.get(dtl_region_code)
         #st.write(st.session_state.user["dtl_region"])
     st.divider()
     st.header("📚 맞춤 추천 도서")
 
-    # 도서 검색 중 표시
+    # 도서 검색 중 표시 (첫 페이지만 조회)
+    pager = get_book_pager(dict(st.session_state.user))
     with st.spinner("당신을 위한 도서를 찾고 있습니다..."):
-        books, error = get_popular_books(st.session_state.user)
+        books = pager.page(1)
+        error = pager.error
 
     # 에러 처리
     if error:
@@ -469,7 +772,7 @@ elif st.session_state.step == 6:
 
     # 도서 표시
     else:
-        st.success(f"✨ {len(books)}권의 추천 도서를 찾았습니다!")
+        st.success(f"✨ {pager.loaded_count}권{'+' if not pager.exhausted else ''}의 추천 도서를 찾았습니다!")
 
         # 필터 옵션
         col1, col2, col3 = st.columns(3)
@@ -482,15 +785,42 @@ elif st.session_state.step == 6:
 
         st.divider()
 
-        # 도서 카드 표시
-        display_books = books[:show_count]
+        # 도서 카드 표시 (필요한 페이지까지만 추가 조회)
+        show_total = show_count + st.session_state.book_extra_count
+        display_books = pager.take(show_total)
+
+        # 표시할 도서의 소장 도서관을 한 번에 동시 조회 (세션 내 재사용)
+        if "holdings" not in st.session_state:
+            st.session_state.holdings = {}
+
+        region_code = REGION_REVERSE.get(st.session_state.user.get("region"))
+        dtl_region_code = DTL_REGION_REVERSE.get(st.session_state.user.get("dtl_region"))
+
+        if location and region_code:
+            missing = [
+                book.get("doc", {}).get("isbn13", "")
+                for book in display_books
+                if (book.get("doc", {}).get("isbn13", ""), region_code, dtl_region_code) not in st.session_state.holdings
+            ]
+            if missing:
+                with st.spinner("주변 소장 도서관을 확인하고 있습니다..."):
+                    fetched = prefetch_nearby_libraries(missing, region_code, dtl_region_code)
+                for isbn, result in fetched.items():
+                    st.session_state.holdings[(isbn, region_code, dtl_region_code)] = result
 
         for idx, book in enumerate(display_books):
-            display_book_card(book, location)
+            isbn13 = book.get("doc", {}).get("isbn13", "")
+            holdings = st.session_state.holdings.get((isbn13, region_code, dtl_region_code))
+            display_book_card(book, location, holdings)
 
-        # 더보기 버튼
-        if len(books) > show_count:
-            st.info(f"📖 {len(books) - show_count}권의 도서가 더 있습니다.")
+        if pager.error:
+            st.warning(f"다음 페이지 조회 실패: {pager.error}")
+
+        # 더보기 버튼 (다음 페이지만 추가 조회)
+        if pager.has_more(show_total):
+            if st.button("📖 도서 더 보기", use_container_width=True):
+                st.session_state.book_extra_count += BOOK_PAGE_SIZE
+                st.rerun()
 
 #    선택된 도서가 있는 경우 도서관 검색
     if "selected_book" in st.session_state:
@@ -500,11 +830,15 @@ elif st.session_state.step == 6:
         selected = st.session_state.selected_book
         # st.markdown(f"**선택한 도서**: {selected['bookname']}")
 
-        st.session_state.user["library"]=search_nearby_libraries(
+        region_code = REGION_REVERSE.get(st.session_state.user.get("region"))
+        dtl_region_code = DTL_REGION_REVERSE.get(st.session_state.user.get("dtl_region"))
+        holdings_key = (selected["isbn13"], region_code, dtl_region_code)
+
+        # 반경 검색 결과는 세션 내 재사용, 미리 조회한 지역 검색 결과는 대체용으로 사용
+        st.session_state.user["library"] = find_nearby_libraries(
             selected["isbn13"],
             selected["location"],
-            REGION_REVERSE[st.session_state.user["region"]],
-            DTL_REGION_REVERSE[st.session_state.user["dtl_region"]]
+            st.session_state.get("holdings", {}).get(holdings_key),
         )
         # 뒤로가기
         #st.write(st.session_state.user["library"][0][0]["library"]["latitude"])
@@ -526,4 +860,7 @@ elif st.session_state.step == 6:
     with col2:
         if st.button("💾 추천 결과 저장", use_container_width=True):
             # TODO: 추천 결과 저장 기능
-            st.success("저장되었습니다!")
\ No newline at end of file
+            st.success("저장되었습니다!")
+
+    # 이번 실행의 외부 API 호출 수 (UI 조작만 했다면 0이어야 함)
+    st.caption(f"🔌 이번 실행의 외부 API 호출: {rerun_calls['count']}회")
\ No newline at end of file
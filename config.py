@@ -8,4 +8,20 @@ KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
 if not KAKAO_REST_API_KEY:
     raise RuntimeError("KAKAO_REST_API_KEY 없음")
 if not NARU_API_KEY:
-    raise RuntimeError("NARU_API_KEY 없음")
\ No newline at end of file
+    raise RuntimeError("NARU_API_KEY 없음")
+
+# 정보나루 응답 캐시 설정 (초 / 바이트)
+BOOK_CACHE_TTL = int(os.getenv("BOOK_CACHE_TTL", 60 * 60))
+BOOK_CACHE_STALE_TTL = int(os.getenv("BOOK_CACHE_STALE_TTL", 24 * 60 * 60))
+BOOK_CACHE_MAX_BYTES = int(os.getenv("BOOK_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+# 역지오코딩 캐시: geohash 자릿수 (7 ≈ 150m 셀) 및 유효 기간 (초)
+GEOCODE_PRECISION = int(os.getenv("GEOCODE_PRECISION", 7))
+GEOCODE_TTL = int(os.getenv("GEOCODE_TTL", 7 * 24 * 60 * 60))
+
+# 인기대출도서 오프라인 스냅샷 유효 기간 (초)
+TREND_SNAPSHOT_MAX_AGE = int(os.getenv("TREND_SNAPSHOT_MAX_AGE", 7 * 24 * 60 * 60))
+
+# 전국 도서관 목록 갱신 주기 (초) 및 소장 도서관 검색 반경 (미터)
+LIBRARY_DIRECTORY_MAX_AGE = int(os.getenv("LIBRARY_DIRECTORY_MAX_AGE", 7 * 24 * 60 * 60))
+LIBRARY_SEARCH_RADIUS_M = int(os.getenv("LIBRARY_SEARCH_RADIUS_M", 3000))
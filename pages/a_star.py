@@ -3,10 +3,18 @@ import osmnx as ox
 import networkx as nx
 import folium
 from folium import plugins
-import time
-import heapq
 from streamlit_folium import folium_static
 import pandas as pd
+from functools import partial
+from user.graph_cache import get_graph, get_csr, load_index, bbox_covers
+from user.pathfinding import astar_path, alt_path, dijkstra_path, bidirectional_astar_path, bidirectional_dijkstra_path, dijkstra_multi_target
+from user.contraction import ch_path, load_hierarchy
+from user.landmarks import load_landmarks
+from user.map import rank_libraries_by_walking
+from user.overpass_graph import load_offline_graph
+from user.graph_tiles import get_corridor_graph
+from user.node_index import get_node_index
+from user.route_cache import route_cache, route_key
 
 # 페이지 설정
 st.set_page_config(page_title="도서관 찾기", layout="wide")
@@ -14,6 +22,10 @@ st.set_page_config(page_title="도서관 찾기", layout="wide")
 # 제목
 st.title("가장 가까운 도서관")
 
+# 보행 거리로 재정렬할 도서관 범위 (직선 거리) 및 도로망 탐색 상한 (미터)
+WALK_RANK_RADIUS_M = 5000
+WALK_RANK_MAX_M = 10000
+
 # 사이드바 - 입력
 st.sidebar.header("📍 좌표 입력")
 
@@ -31,6 +43,7 @@ try:
 
     start_lat = st.session_state.user["lat"]
     start_lon = st.session_state.user["lng"]  # ✅ lng 사용
+    library_results = []
 
     # 도착지 좌표 (도서관)
     if "library" in st.session_state.user and st.session_state.user["library"]:
@@ -39,6 +52,7 @@ try:
 
         if isinstance(library_data, tuple) and library_data[0]:
             # ✅ 첫 번째 도서관 정보 가져오기
+            library_results = library_data[0]
             nearest_library = library_data[0][0]["library"]
             end_lat = float(nearest_library["latitude"])
             end_lon = float(nearest_library["longitude"])
@@ -62,6 +76,7 @@ except Exception as e:
     end_lat = 37.361570
     end_lon = 126.928288
     library_name = "기본 도서관"
+    library_results = []
 
 # 📍 현재 좌표 정보 표시
 st.sidebar.markdown("### 📍 현재 경로")
@@ -85,91 +100,34 @@ with st.sidebar.expander("🔧 디버그 정보"):
         "selected_book": st.session_state.get("selected_book", "None")
     })
 
+# 알고리즘 목록: 선택지 → (표시 이름, 탐색 함수, 비교 시 경로 색)
+ALGORITHMS = {
+    "A* (A-Star)": ("A*", astar_path, 'blue'),
+    "Dijkstra": ("Dijkstra", dijkstra_path, 'red'),
+    "양방향 A*": ("양방향 A*", bidirectional_astar_path, 'purple'),
+    "양방향 Dijkstra": ("양방향 Dijkstra", bidirectional_dijkstra_path, 'orange'),
+    "ALT A*": ("ALT A*", alt_path, 'darkgreen'),
+    "Contraction Hierarchies": ("CH", ch_path, 'green'),
+}
+# 그래프별 전처리가 필요한 알고리즘: 선택지 → (탐색 함수 인자 이름, 로더, 전처리 모듈)
+PREPROCESSED = {
+    "ALT A*": ("landmarks", load_landmarks, "user.landmarks"),
+    "Contraction Hierarchies": ("hierarchy", load_hierarchy, "user.contraction"),
+}
+COMPARE_ALL = "전체 비교"
+
 # 알고리즘 선택
-algorithm = st.sidebar.selectbox("알고리즘 선택", ["A* (A-Star)", "Dijkstra", "둘 다 비교"])
+algorithm = st.sidebar.selectbox("알고리즘 선택", list(ALGORITHMS) + [COMPARE_ALL])
 
 # 보행 속도 설정
 walking_speed = st.sidebar.slider("보행 속도 (km/h)", 3.0, 6.0, 4.5, 0.5)
 
-
-# A* 알고리즘 구현
-def astar_path(G, source, target, weight='length'):
-    """A* 알고리즘으로 최단 경로 찾기"""
-
-    def heuristic(n1, n2):
-        # 유클리드 거리 (휴리스틱)
-        x1, y1 = G.nodes[n1]['x'], G.nodes[n1]['y']
-        x2, y2 = G.nodes[n2]['x'], G.nodes[n2]['y']
-        return ox.distance.great_circle(y1, x1, y2, x2)
-
-    # 시작 시간 측정
-    start_time = time.time()
-
-    # 초기화
-    open_set = []
-    heapq.heappush(open_set, (0 + heuristic(source, target), 0, source, [source]))
-    visited = set()
-    nodes_visited = 0
-
-    while open_set:
-        f, g, current, path = heapq.heappop(open_set)
-
-        if current in visited:
-            continue
-
-        visited.add(current)
-        nodes_visited += 1
-
-        # 목표 도달
-        if current == target:
-            end_time = time.time()
-            return path, g, end_time - start_time, nodes_visited
-
-        # 이웃 노드 탐색
-        for neighbor in G.neighbors(current):
-            if neighbor not in visited:
-                edge_weight = G[current][neighbor][0].get(weight, 1)
-                new_g = g + edge_weight
-                new_f = new_g + heuristic(neighbor, target)
-                heapq.heappush(open_set, (new_f, new_g, neighbor, path + [neighbor]))
-
-    return None, None, None, None
-
-
-# Dijkstra 알고리즘 구현
-def dijkstra_path(G, source, target, weight='length'):
-    """Dijkstra 알고리즘으로 최단 경로 찾기"""
-
-    start_time = time.time()
-
-    # 초기화
-    open_set = []
-    heapq.heappush(open_set, (0, source, [source]))
-    visited = set()
-    nodes_visited = 0
-
-    while open_set:
-        dist, current, path = heapq.heappop(open_set)
-
-        if current in visited:
-            continue
-
-        visited.add(current)
-        nodes_visited += 1
-
-        # 목표 도달
-        if current == target:
-            end_time = time.time()
-            return path, dist, end_time - start_time, nodes_visited
-
-        # 이웃 노드 탐색
-        for neighbor in G.neighbors(current):
-            if neighbor not in visited:
-                edge_weight = G[current][neighbor][0].get(weight, 1)
-                new_dist = dist + edge_weight
-                heapq.heappush(open_set, (new_dist, neighbor, path + [neighbor]))
-
-    return None, None, None, None
+# 도로망 데이터
+# - 다운로드: 구간을 감싸는 원형 영역 그래프 (포함하는 그래프가 캐시에 있으면 재사용)
+# - 타일: 구간에 걸친 고정 격자 타일만 불러와 이어 붙임 (겹치는 질의끼리 타일 공유)
+# - 오프라인: cache/*.json Overpass 데이터로 만든 그래프 (네트워크 없이 항상 같은 결과)
+GRAPH_SOURCES = ["OSM 다운로드", "타일 (구간별 로드)", "오프라인 (로컬 Overpass)"]
+graph_source = st.sidebar.selectbox("도로망 데이터", GRAPH_SOURCES)
 
 
 # 경로 찾기 버튼
@@ -182,24 +140,91 @@ if st.button("🔍 경로 찾기", type="primary"):
             center_lon = (start_lon + end_lon) / 2
 
             # 거리 계산 (여유있게 다운로드)
-            dist = ox.distance.great_circle(start_lat, start_lon, end_lat, end_lon)
-
-            # OSM 보행자 네트워크 다운로드
-            G = ox.graph_from_point(
-                (center_lat, center_lon),
-                dist=dist * 1.5,  # 여유있게
-                network_type='walk'  # 보행자 도로
-            )
-
-            st.success(f"✅ 도로 네트워크 다운로드 완료! (노드: {len(G.nodes)}, 엣지: {len(G.edges)})")
+            dist = ox.distance.great_circle(start_lat, start_lon, end_lat, end_lon) * 1.5
+
+            # 보행 거리로 비교할 후보 도서관 (좌표가 있고 직선 거리가 가까운 곳)
+            candidates = [
+                result for result in library_results
+                if result["distance_m"] <= WALK_RANK_RADIUS_M
+                and float(result["library"].get("latitude") or 0)
+                and float(result["library"].get("longitude") or 0)
+            ]
+
+            # 후보 도서관이 모두 들어가도록 다운로드 범위 확장
+            if candidates:
+                points = [(start_lat, start_lon), (end_lat, end_lon)] + [
+                    (float(r["library"]["latitude"]), float(r["library"]["longitude"])) for r in candidates
+                ]
+                lats = [p[0] for p in points]
+                lons = [p[1] for p in points]
+                center_lat = (min(lats) + max(lats)) / 2
+                center_lon = (min(lons) + max(lons)) / 2
+                dist = max(dist, max(ox.distance.great_circle(center_lat, center_lon, lat, lon) for lat, lon in points) * 1.2)
+
+            if graph_source == "타일 (구간별 로드)":
+                # 출발지에서 도착지·후보 도서관까지의 구간에 걸친 타일만 로드 (세션 간 공유 타일 LRU)
+                graph_id, G, cached = get_corridor_graph([(start_lat, start_lon), (end_lat, end_lon)] + [
+                    (float(r["library"]["latitude"]), float(r["library"]["longitude"])) for r in candidates
+                ])
+
+                source = "타일 캐시 사용" if cached else "타일 다운로드 완료"
+            elif graph_source == "오프라인 (로컬 Overpass)":
+                # 로컬 Overpass 데이터 그래프 (처음 한 번 생성 후 그래프 캐시에 저장)
+                graph_id, G, cached = load_offline_graph()
+
+                coverage = load_index()[graph_id]["bbox"]
+                if not all(bbox_covers(coverage, (lat, lon, lat, lon)) for lat, lon in [(start_lat, start_lon), (end_lat, end_lon)]):
+                    st.warning("⚠️ 출발지 또는 도착지가 로컬 데이터 범위 밖입니다. 가장 가까운 도로 노드로 대신 탐색합니다.")
+
+                source = "로컬 데이터 사용" if cached else "로컬 데이터로 생성"
+            else:
+                # OSM 보행자 네트워크 (이미 이 영역을 포함하는 그래프가 있으면 재사용)
+                graph_id, G, cached = get_graph(
+                    center_lat,
+                    center_lon,
+                    dist,  # 여유있게
+                    network_type='walk'  # 보행자 도로
+                )
+
+                source = "캐시 사용" if cached else "다운로드 완료"
+            st.success(f"✅ 도로 네트워크 {source}! (노드: {len(G.nodes)}, 엣지: {len(G.edges)})")
 
         except Exception as e:
             st.error(f"❌ 데이터 다운로드 실패: {e}")
             st.stop()
 
-    # 가장 가까운 노드 찾기
-    start_node = ox.distance.nearest_nodes(G, start_lon, start_lat)
-    end_node = ox.distance.nearest_nodes(G, end_lon, end_lat)
+    # 탐색용 CSR 배열 그래프 (그래프별로 한 번만 변환)
+    csr = get_csr(graph_id, G)
+
+    # 출발지, 도착지, 후보 도서관을 한 번의 질의로 가장 가까운 노드에 연결 (그래프별 인덱스 재사용)
+    node_index = get_node_index(graph_id, csr)
+    if node_index.tree is None:
+        st.caption("ℹ️ scipy가 설치되지 않아 최근접 노드를 전수 비교로 찾습니다 (`pip install scipy` 권장).")
+    snapped, _ = node_index.nearest(
+        [start_lat, end_lat] + [float(r["library"]["latitude"]) for r in candidates],
+        [start_lon, end_lon] + [float(r["library"]["longitude"]) for r in candidates],
+    )
+    start_node, end_node = int(snapped[0]), int(snapped[1])
+    library_nodes = snapped[2:].tolist()
+
+    # 후보 도서관을 한 번의 다중 목적지 Dijkstra로 실제 보행 거리 기준 정렬
+    ranked_libraries = []
+    if candidates:
+        walking, rank_time, rank_nodes = dijkstra_multi_target(
+            csr, start_node, library_nodes, cutoff=WALK_RANK_MAX_M
+        )
+        ranked_libraries = rank_libraries_by_walking(
+            [dict(r, node=node) for r, node in zip(candidates, library_nodes)],
+            [walking.get(node) for node in library_nodes],
+        )
+
+        # 보행 거리가 가장 짧은 도서관을 도착지로 사용
+        best = ranked_libraries[0]
+        if best["walking_distance_m"] is not None:
+            end_lat = float(best["library"]["latitude"])
+            end_lon = float(best["library"]["longitude"])
+            library_name = best["library"].get("libName", "도서관")
+            end_node = best["node"]
 
     # 컬럼 레이아웃
     col1, col2 = st.columns([2, 1])
@@ -233,89 +258,123 @@ if st.button("🔍 경로 찾기", type="primary"):
     # 알고리즘 실행
     results = []
 
-    if algorithm in ["A* (A-Star)", "둘 다 비교"]:
-        with st.spinner("A* 알고리즘 실행 중..."):
-            path_astar, dist_astar, time_astar, nodes_astar = astar_path(G, start_node, end_node)
-
-            if path_astar:
-                # 경로 좌표 추출
-                route_coords = [(G.nodes[node]['y'], G.nodes[node]['x']) for node in path_astar]
-
-                # 지도에 경로 그리기
+    selected_algorithms = list(ALGORITHMS) if algorithm == COMPARE_ALL else [algorithm]
+
+    for option in selected_algorithms:
+        name, search, compare_color = ALGORITHMS[option]
+
+        with st.spinner(f"{name} 알고리즘 실행 중..."):
+            # 같은 그래프·같은 노드 쌍·같은 알고리즘이면 탐색 없이 저장된 경로 사용
+            cache_key = route_key(graph_id, start_node, end_node, option)
+            route = route_cache.get(cache_key)
+            cache_hit = route is not None
+
+            if not cache_hit:
+                if option in PREPROCESSED:
+                    keyword, loader, module = PREPROCESSED[option]
+                    prepared = loader(graph_id, csr)
+                    if prepared is None:
+                        if graph_source == "타일 (구간별 로드)":
+                            # 타일 구간 그래프는 디스크에 저장되지 않아 전처리 명령을 쓸 수 없음
+                            st.info(f"ℹ️ {name}: 타일 구간 그래프는 전처리를 지원하지 않습니다. 다른 도로망 데이터를 선택하세요.")
+                        else:
+                            st.info(f"ℹ️ {name}: 전처리 데이터가 없거나 현재 그래프와 맞지 않습니다. `python -m {module} {graph_id}` 실행 후 사용할 수 있습니다.")
+                        continue
+                    search = partial(search, **{keyword: prepared})
+
+                path, route_dist, compute_time, nodes_explored = search(csr, start_node, end_node)
+
+                if path:
+                    route = {
+                        "path": path,
+                        "distance": route_dist,
+                        # 경로 좌표 추출
+                        "coords": [(G.nodes[node]['y'], G.nodes[node]['x']) for node in path],
+                        "compute_time": compute_time,
+                        "nodes_explored": nodes_explored,
+                    }
+                    route_cache.put(cache_key, route)
+
+            if route:
+                route_dist = route["distance"]
+
+                # 지도에 경로 그리기 (비교 시 알고리즘별 색)
+                color = compare_color if algorithm == COMPARE_ALL else 'blue'
                 folium.PolyLine(
-                    route_coords,
-                    color='blue',
-                    weight=5,
-                    opacity=0.7,
-                    popup='A* 경로'
-                ).add_to(m)
-
-                # 결과 저장
-                results.append({
-                    "알고리즘": "A*",
-                    "거리 (m)": round(dist_astar, 1),
-                    "시간 (분)": round(dist_astar / 1000 / walking_speed * 60, 1),
-                    "계산시간 (ms)": round(time_astar * 1000, 2),
-                    "탐색 노드": nodes_astar
-                })
-
-    if algorithm in ["Dijkstra", "둘 다 비교"]:
-        with st.spinner("Dijkstra 알고리즘 실행 중..."):
-            path_dijkstra, dist_dijkstra, time_dijkstra, nodes_dijkstra = dijkstra_path(G, start_node, end_node)
-
-            if path_dijkstra:
-                # 경로 좌표 추출
-                route_coords = [(G.nodes[node]['y'], G.nodes[node]['x']) for node in path_dijkstra]
-
-                # 지도에 경로 그리기 (비교 시 다른 색)
-                color = 'red' if algorithm == "둘 다 비교" else 'blue'
-                folium.PolyLine(
-                    route_coords,
+                    route["coords"],
                     color=color,
                     weight=5,
                     opacity=0.7,
-                    popup='Dijkstra 경로'
+                    popup=f'{name} 경로'
                 ).add_to(m)
 
-                # 결과 저장
+                # 결과 저장 (캐시 적중 시 계산시간·탐색 노드는 처음 탐색 기준)
                 results.append({
-                    "알고리즘": "Dijkstra",
-                    "거리 (m)": round(dist_dijkstra, 1),
-                    "시간 (분)": round(dist_dijkstra / 1000 / walking_speed * 60, 1),
-                    "계산시간 (ms)": round(time_dijkstra * 1000, 2),
-                    "탐색 노드": nodes_dijkstra
+                    "알고리즘": name,
+                    "거리 (m)": round(route_dist, 1),
+                    "시간 (분)": round(route_dist / 1000 / walking_speed * 60, 1),
+                    "계산시간 (ms)": round(route["compute_time"] * 1000, 2),
+                    "탐색 노드": route["nodes_explored"],
+                    "캐시": "적중" if cache_hit else "-",
                 })
 
     # 결과 출력
     with col1:
         folium_static(m, width=800, height=600)
 
+        if ranked_libraries:
+            st.subheader("🏛️ 보행 거리 기준 도서관 순위")
+            st.caption(f"다중 목적지 Dijkstra 1회: {round(rank_time * 1000, 2)}ms, 탐색 노드 {rank_nodes}개")
+            st.dataframe(pd.DataFrame([
+                {
+                    "도서관": r["library"].get("libName", "도서관"),
+                    "직선거리 (m)": r["distance_m"],
+                    "보행거리 (m)": r["walking_distance_m"] if r["walking_distance_m"] is not None else "경로 없음",
+                    "보행시간": r["walking_time_str"] if r["walking_distance_m"] is not None else "-",
+                }
+                for r in ranked_libraries
+            ]), use_container_width=True)
+
     with col2:
         if results:
             df = pd.DataFrame(results)
             st.dataframe(df, use_container_width=True)
 
-            # 성능 비교
-            # 성능 비교
-            if len(results) == 2:
-                st.markdown("### 🔥 성능 개선")
+            cache_stats = route_cache.stats()
+            st.caption(
+                f"경로 캐시: 적중 {cache_stats['hits']}회 / 미스 {cache_stats['misses']}회 "
+                f"(적중률 {cache_stats['hit_rate'] * 100:.0f}%, {cache_stats['entries']}개 저장)"
+            )
 
-                # ✅ A*와 Dijkstra 구분
-                astar_result = next((r for r in results if r["알고리즘"] == "A*"), None)
-                dijkstra_result = next((r for r in results if r["알고리즘"] == "Dijkstra"), None)
+            # 성능 비교 (Dijkstra 기준)
+            dijkstra_result = next((r for r in results if r["알고리즘"] == "Dijkstra"), None)
+            if len(results) >= 2 and dijkstra_result:
+                st.markdown("### 🔥 성능 개선 (Dijkstra 대비)")
+
+                for result in results:
+                    if result is dijkstra_result:
+                        continue
 
-                if astar_result and dijkstra_result:
-                    # ✅ 올바른 비교: Dijkstra / A*
-                    speedup = dijkstra_result["계산시간 (ms)"] / astar_result["계산시간 (ms)"]
-                    node_reduction = (1 - astar_result["탐색 노드"] / dijkstra_result["탐색 노드"]) * 100
+                    name = result["알고리즘"]
+                    speedup = dijkstra_result["계산시간 (ms)"] / max(result["계산시간 (ms)"], 0.01)
+                    node_reduction = (1 - result["탐색 노드"] / dijkstra_result["탐색 노드"]) * 100
 
-                    # ✅ 실제로 A*가 빠른지 확인
+                    # ✅ 실제로 더 빠른지 확인
                     if speedup > 1:
-                        st.metric("계산 속도", f"{speedup:.2f}배 빠름", delta="A* 승리 🎉")
-                        st.metric("노드 탐색", f"{node_reduction:.1f}% 감소", delta="A* 효율적 ⚡")
+                        st.metric(f"{name} 계산 속도", f"{speedup:.2f}배 빠름", delta=f"{name} 승리 🎉")
                     else:
-                        st.metric("계산 속도", f"{1 / speedup:.2f}배 느림", delta="Dijkstra 승리", delta_color="inverse")
-                        st.metric("노드 탐색", f"{node_reduction:.1f}% 감소", delta="A*가 더 적게 탐색")
+                        st.metric(f"{name} 계산 속도", f"{1 / speedup:.2f}배 느림", delta="Dijkstra 승리", delta_color="inverse")
+                    st.metric(f"{name} 노드 탐색", f"{node_reduction:.1f}% 감소", delta=f"{name} 효율적 ⚡" if node_reduction > 0 else None)
+
+            # ALT 휴리스틱 효과 (같은 출발/도착의 일반 A* 대비)
+            alt_result = next((r for r in results if r["알고리즘"] == "ALT A*"), None)
+            if alt_result:
+                astar_result = next((r for r in results if r["알고리즘"] == "A*"), None)
+                astar_nodes = astar_result["탐색 노드"] if astar_result else astar_path(csr, start_node, end_node)[3]
+                if astar_nodes:
+                    st.markdown("### 🧭 ALT 효과 (A* 대비)")
+                    alt_reduction = (1 - alt_result["탐색 노드"] / astar_nodes) * 100
+                    st.metric("ALT 노드 탐색", f"{alt_reduction:.1f}% 감소", delta=f"A* {astar_nodes}개 → ALT {alt_result['탐색 노드']}개")
 
             # 상세 정보
             st.markdown("### 📝 상세 정보")
@@ -336,8 +395,8 @@ if st.button("⬅️ 도서 목록으로 돌아가기", use_container_width=True
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📚 프로젝트 정보")
 st.sidebar.info("""
-**데이터 출처**: OpenStreetMap  
-**알고리즘**: A*, Dijkstra  
+**데이터 출처**: OpenStreetMap (오프라인 모드: cache/*.json Overpass 응답)  
+**알고리즘**: A*, Dijkstra (단방향/양방향), ALT, Contraction Hierarchies  
 **언어**: Python  
 **라이브러리**: osmnx, networkx, folium
 """)
\ No newline at end of file
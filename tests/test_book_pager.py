@@ -0,0 +1,77 @@
+from user.book_pager import BookPager
+
+
+def make_fetch(pages, calls=None):
+    def fetch(page_no, page_size):
+        if calls is not None:
+            calls.append(page_no)
+        return pages.get(page_no, []), None
+    return fetch
+
+
+def book(isbn):
+    return {"doc": {"isbn13": isbn}}
+
+
+def key(b):
+    return b["doc"]["isbn13"]
+
+
+def test_counts_are_deduplicated():
+    # 여러 질의를 합친 페이지: 길이가 page_size와 다르고 페이지 간 중복 있음
+    pages = {
+        1: [book("a"), book("b"), book("c"), book("d")],
+        2: [book("c"), book("d"), book("e")],
+        3: [book("e")],
+    }
+    pager = BookPager(make_fetch(pages), page_size=3, key=key)
+
+    books = pager.take(100)
+
+    assert [key(b) for b in books] == ["a", "b", "c", "d", "e"]
+    assert pager.loaded_count == len(books)
+    assert pager.exhausted
+    assert not pager.has_more(len(books))
+
+
+def test_page_without_new_books_ends_pagination():
+    pages = {
+        1: [book("a"), book("b")],
+        2: [book("a"), book("b")],
+        3: [book("c"), book("d")],
+    }
+    calls = []
+    pager = BookPager(make_fetch(pages, calls), page_size=2, key=key)
+
+    assert [key(b) for b in pager.take(10)] == ["a", "b"]
+    assert calls == [1, 2]
+    assert not pager.has_more(2)
+
+
+def test_fetches_only_needed_pages():
+    pages = {n: [book(f"{n}-{i}") for i in range(2)] for n in range(1, 6)}
+    calls = []
+    pager = BookPager(make_fetch(pages, calls), page_size=2, key=key)
+
+    assert len(pager.take(3)) == 3
+    assert calls == [1, 2]
+    assert pager.loaded_count == 4
+    assert pager.has_more(4)
+
+
+def test_error_is_retried():
+    state = {"fail": True}
+
+    def fetch(page_no, page_size):
+        if page_no == 2 and state["fail"]:
+            return [], "timeout"
+        return [book(f"{page_no}-{i}") for i in range(2)] if page_no <= 2 else [], None
+
+    pager = BookPager(fetch, page_size=2, key=key)
+    assert len(pager.take(4)) == 2
+    assert pager.error == "timeout"
+    assert pager.has_more(2)
+
+    state["fail"] = False
+    assert len(pager.take(4)) == 4
+    assert pager.error is None
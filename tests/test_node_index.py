@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from user import node_index
+from user.csr_graph import CSRGraph
+from user.map import calculate_distances
+from user.node_index import NodeIndex, get_node_index
+from user.route_bench import grid_arrays
+
+
+def to_csr(arrays):
+    return CSRGraph.from_arrays(
+        arrays["node_ids"], arrays["x"], arrays["y"],
+        arrays["edge_u"], arrays["edge_v"], arrays["edge_length"],
+    )
+
+
+@pytest.fixture
+def graph_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(node_index, "GRAPH_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(node_index, "load_index", lambda: {"g1": {}})
+    return tmp_path
+
+
+def test_nearest_matches_haversine():
+    arrays = grid_arrays(15, seed=1)
+    index = NodeIndex.from_coords(arrays["node_ids"], arrays["x"], arrays["y"])
+
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(arrays["y"].min(), arrays["y"].max(), 200)
+    lons = rng.uniform(arrays["x"].min(), arrays["x"].max(), 200)
+    node_ids, _ = index.nearest(lats, lons)
+
+    for lat, lon, node in zip(lats, lons, node_ids.tolist()):
+        distances = calculate_distances(lat, lon, arrays["y"], arrays["x"])
+        # 평면 근사라 거의 같은 거리의 노드끼리는 바뀔 수 있음
+        assert distances[node - 1] <= distances.min() + 0.01
+
+    node, _ = index.nearest(float(lats[0]), float(lons[0]))
+    assert node == int(node_ids[0])
+
+
+def test_saved_index_is_rebuilt_when_graph_changes(graph_dir):
+    old = to_csr(grid_arrays(10, seed=1))
+    get_node_index("g1", old)
+    assert (graph_dir / "g1.nodes.npz").exists()
+
+    # 같은 graph_id로 다른 그래프 (노드 ID가 겹치지 않도록 이동)
+    arrays = grid_arrays(12, seed=2)
+    arrays["node_ids"] = arrays["node_ids"] + 1000
+    new = to_csr(arrays)
+
+    index = get_node_index("g1", new)
+    nodes, _ = index.nearest(arrays["y"][:20], arrays["x"][:20])
+    assert all(node in new.index for node in nodes.tolist())
+    assert np.array_equal(NodeIndex.load(str(graph_dir / "g1.nodes.npz")).node_ids, new.node_ids)
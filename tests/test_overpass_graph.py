@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from user.csr_graph import CSRGraph
+from user.map import calculate_distance
+from user.overpass_graph import build_walk_arrays, is_walkable, iter_elements
+from user.pathfinding import astar_path, dijkstra_path
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "overpass_small.json")
+
+
+def to_csr(arrays):
+    return CSRGraph.from_arrays(
+        arrays["node_ids"], arrays["x"], arrays["y"],
+        arrays["edge_u"], arrays["edge_v"], arrays["edge_length"],
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_iter_elements_matches_json_load(chunk_size):
+    with open(FIXTURE, encoding="utf-8") as f:
+        expected = json.load(f)["elements"]
+
+    assert list(iter_elements(FIXTURE, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("tags, walkable", [
+    ({"highway": "footway"}, True),
+    ({"highway": "unclassified"}, True),
+    ({"highway": "motorway"}, False),
+    ({"highway": "motorway_link"}, False),
+    ({"highway": "residential", "foot": "no"}, False),
+    ({"highway": "service", "service": "private"}, False),
+    ({"highway": "pedestrian", "area": "yes"}, False),
+    ({"building": "yes"}, False),
+])
+def test_is_walkable_matches_osmnx_walk_filter(tags, walkable):
+    assert is_walkable(tags) == walkable
+
+
+def test_build_walk_arrays_counts():
+    # 고속도로, 사유 도로, 없는 노드를 참조하는 구간은 제외, oneway:foot은 한 방향만
+    arrays = build_walk_arrays([FIXTURE], retain_all=True)
+    assert arrays["node_ids"].tolist() == [1, 2, 3, 4, 5, 6, 7]
+    assert len(arrays["edge_u"]) == 8
+
+    # 기본값은 가장 큰 연결 요소만 (6-7 구간 제외)
+    arrays = build_walk_arrays([FIXTURE])
+    assert arrays["node_ids"].tolist() == [1, 2, 3, 4, 5]
+    assert len(arrays["edge_u"]) == 6
+
+    node_ids = arrays["node_ids"].tolist()
+    pairs = {(node_ids[u], node_ids[v]) for u, v in zip(arrays["edge_u"].tolist(), arrays["edge_v"].tolist())}
+    assert pairs == {(1, 2), (2, 1), (2, 3), (3, 2), (3, 4), (4, 5)}
+
+
+def test_routes_on_fixture():
+    arrays = build_walk_arrays([FIXTURE])
+    csr = to_csr(arrays)
+
+    path, dist, _, _ = dijkstra_path(csr, 1, 5)
+    assert path == [1, 2, 3, 4, 5]
+    assert dist == pytest.approx(4 * calculate_distance(37.5, 127.0, 37.501, 127.0), rel=1e-4)
+    assert astar_path(csr, 1, 5)[:2] == (path, pytest.approx(dist))
+
+    # 일방통행(oneway:foot)이라 반대 방향은 경로 없음
+    assert dijkstra_path(csr, 5, 1)[0] is None
@@ -0,0 +1,138 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from user.contraction import ContractionHierarchy, build_hierarchy, ch_path
+from user.csr_graph import CSRGraph
+from user.graph_cache import arrays_to_graph
+from user.landmarks import build_landmarks
+from user.pathfinding import alt_path, bidirectional_astar_path, bidirectional_dijkstra_path
+from user.route_bench import grid_arrays
+
+PAIRS = 40
+
+
+@pytest.fixture(scope="module")
+def grid():
+    arrays = grid_arrays(12, seed=3)
+    csr = CSRGraph.from_arrays(
+        arrays["node_ids"], arrays["x"], arrays["y"],
+        arrays["edge_u"], arrays["edge_v"], arrays["edge_length"],
+    )
+    return csr, arrays_to_graph(arrays)
+
+
+def reachable_pairs(G, count, seed=0):
+    rng = random.Random(seed)
+    nodes = sorted(G.nodes)
+    pairs = []
+    while len(pairs) < count:
+        s, t = rng.choice(nodes), rng.choice(nodes)
+        if s != t and nx.has_path(G, s, t):
+            pairs.append((s, t))
+    return pairs
+
+
+def assert_valid_route(G, path, dist, s, t):
+    """경로가 s에서 t까지 실제 엣지로 이어지고 길이가 networkx 최단 거리와 같은지"""
+    assert path[0] == s and path[-1] == t
+    assert all(G.has_edge(u, v) for u, v in zip(path, path[1:]))
+
+    expected = nx.shortest_path_length(G, s, t, weight="length")
+    assert dist == pytest.approx(expected, abs=1e-3)
+    assert nx.path_weight(G, path, "length") == pytest.approx(expected, abs=1e-3)
+
+
+@pytest.mark.parametrize("search", [bidirectional_astar_path, bidirectional_dijkstra_path])
+def test_bidirectional_matches_networkx(grid, search):
+    csr, G = grid
+    for s, t in reachable_pairs(G, PAIRS):
+        path, dist, _, _ = search(csr, s, t)
+        assert_valid_route(G, path, dist, s, t)
+
+
+def test_bidirectional_same_node(grid):
+    csr, G = grid
+    node = next(iter(G.nodes))
+    path, dist, _, _ = bidirectional_astar_path(csr, node, node)
+    assert path == [node] and dist == 0
+
+
+@pytest.fixture(scope="module")
+def hierarchy(grid):
+    csr, _ = grid
+    return build_hierarchy(csr)
+
+
+def test_ch_matches_networkx(grid, hierarchy):
+    csr, G = grid
+    assert hierarchy.num_shortcuts > 0
+    for s, t in reachable_pairs(G, PAIRS, seed=1):
+        # 반환 경로는 지름길을 풀어낸 원래 그래프 엣지
+        path, dist, _, _ = ch_path(csr, s, t, hierarchy=hierarchy)
+        assert_valid_route(G, path, dist, s, t)
+
+
+def test_ch_round_trip(grid, hierarchy, tmp_path):
+    csr, G = grid
+    path = tmp_path / "grid.ch.npz"
+    hierarchy.save(str(path))
+    loaded = ContractionHierarchy.load(str(path))
+
+    for s, t in reachable_pairs(G, 10, seed=2):
+        assert ch_path(csr, s, t, hierarchy=loaded)[1] == pytest.approx(ch_path(csr, s, t, hierarchy=hierarchy)[1])
+
+
+
+def two_islands():
+    """서로 이어지지 않은 두 선분 (1-2-3, 4-5)"""
+    return CSRGraph.from_arrays(
+        np.array([1, 2, 3, 4, 5], dtype=np.int64),
+        np.array([127.0, 127.001, 127.002, 127.01, 127.011]),
+        np.full(5, 37.5),
+        np.array([0, 1, 1, 2, 3, 4], dtype=np.int32),
+        np.array([1, 0, 2, 1, 4, 3], dtype=np.int32),
+        np.array([88.0, 88.0, 88.0, 88.0, 88.0, 88.0], dtype=np.float32),
+    )
+
+
+def test_ch_unreachable():
+    csr = two_islands()
+    hierarchy = build_hierarchy(csr)
+
+    assert ch_path(csr, 1, 4, hierarchy=hierarchy)[0] is None
+    assert ch_path(csr, 1, 3, hierarchy=hierarchy)[:2] == ([1, 2, 3], pytest.approx(176.0))
+
+
+@pytest.mark.parametrize("method", ["farthest", "avoid"])
+def test_alt_matches_networkx(grid, method):
+    csr, G = grid
+    landmarks = build_landmarks(csr, k=4, method=method)
+    for s, t in reachable_pairs(G, PAIRS, seed=3):
+        path, dist, _, _ = alt_path(csr, s, t, landmarks=landmarks)
+        assert_valid_route(G, path, dist, s, t)
+
+
+def test_alt_lower_bounds_are_admissible(grid):
+    csr, G = grid
+    landmarks = build_landmarks(csr, k=4)
+    node_ids = csr.node_ids.tolist()
+
+    for t in random.Random(4).sample(range(csr.num_nodes), 5):
+        exact = nx.single_source_dijkstra_path_length(G.reverse(copy=False), node_ids[t], weight="length")
+        bounds = landmarks.lower_bounds(t)
+        for v, node in enumerate(node_ids):
+            if node in exact:
+                # float32 거리표 반올림 허용
+                assert bounds[v] <= exact[node] + 0.01
+
+
+def test_alt_rejects_table_from_other_graph(grid):
+    csr, _ = grid
+    landmarks = build_landmarks(two_islands(), k=2)
+
+    assert not landmarks.matches(csr)
+    with pytest.raises(ValueError):
+        alt_path(csr, int(csr.node_ids[0]), int(csr.node_ids[1]), landmarks=landmarks)
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from user import trend_store
+from user.trend_store import TrendStore, fixture_fetcher, ingest, profile_key
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "trend_snapshot.json")
+
+LITERATURE = {"gender": "1", "age": "20", "kdc": "8"}
+ECONOMY = {"gender": "2", "age": "30", "dtl_kdc": "32"}
+MAX_AGE = 7 * 24 * 60 * 60
+
+
+def key(profile):
+    return profile_key(profile.get("gender"), profile.get("age"), profile.get("kdc"), profile.get("dtl_kdc"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrendStore(str(tmp_path / "trend_store.sqlite3"))
+    count = ingest(store, fixture_fetcher(FIXTURE), profiles=[LITERATURE, ECONOMY], top_k=4)
+    assert count == 2
+    return store
+
+
+def test_fresh_snapshot_pages(store):
+    first = store.lookup(key(LITERATURE), page_no=1, page_size=3, max_age=MAX_AGE)
+    second = store.lookup(key(LITERATURE), page_no=2, page_size=3, max_age=MAX_AGE)
+
+    assert [book["doc"]["bookname"] for book in first] == ["소설 1", "소설 2", "소설 3"]
+    # top_k=4 까지만 저장
+    assert [book["doc"]["bookname"] for book in second] == ["소설 4"]
+    # top-K를 넘는 페이지는 빈 페이지
+    assert store.lookup(key(LITERATURE), page_no=3, page_size=3, max_age=MAX_AGE) == []
+
+    assert len(store.lookup(key(ECONOMY), max_age=MAX_AGE)) == 3
+
+
+def test_stale_snapshot(store, monkeypatch):
+    now = trend_store.time.time()
+    monkeypatch.setattr(trend_store.time, "time", lambda: now + MAX_AGE + 1)
+
+    assert store.lookup(key(LITERATURE), max_age=MAX_AGE) is None
+    # max_age가 없으면 나이와 무관하게 반환
+    assert len(store.lookup(key(LITERATURE))) == 4
+
+
+def test_missing_profile(store):
+    assert store.lookup(key({"gender": "1", "age": "60", "kdc": "1"}), max_age=MAX_AGE) is None
+
+
+def test_ingest_replaces_snapshot(store):
+    ingest(store, lambda params: [{"doc": {"bookname": "새 책", "isbn13": "1"}}], profiles=[LITERATURE])
+
+    assert [book["doc"]["bookname"] for book in store.lookup(key(LITERATURE), max_age=MAX_AGE)] == ["새 책"]
@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pytest
+
+from user.user_vector import BookColumns, batch_recommendation_scores, recommendation_score, top_k_books
+
+KDC_CODES = ["문학", "사회과학", "역사", "예술", "철학"]
+GENRES = ["한국소설", "에세이", "인문", "시", "경제"]
+GENDERS = ["M", "F"]
+
+
+def make_user(rng, gender="M"):
+    return {
+        "gender": gender,
+        "age": rng.randint(0, 80),
+        "kdc": {code: rng.random() for code in rng.sample(KDC_CODES, 2)},
+        "genre": {genre: rng.random() for genre in rng.sample(GENRES, 2)},
+    }
+
+
+def make_book(rng):
+    from_age = rng.randint(0, 60)
+    return {
+        "kdc": rng.choice(KDC_CODES),
+        "genre": rng.choice(GENRES),
+        "from_age": from_age,
+        "to_age": from_age + rng.randint(0, 30),
+        # 성별 비율이 없거나 일부만 있는 도서 포함
+        "gender_ratio": {gender: rng.random() for gender in GENDERS if rng.random() < 0.6},
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_scores_match_scalar(seed):
+    rng = random.Random(seed)
+    books = [make_book(rng) for _ in range(500)]
+    user = make_user(rng, rng.choice(GENDERS + ["any"]))
+
+    scores = batch_recommendation_scores(user, BookColumns.from_books(books))
+    expected = np.array([recommendation_score(user, book) for book in books])
+
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+
+def test_missing_fields_use_scalar_defaults():
+    user = {"gender": "F", "age": 30, "kdc": {"문학": 1.0}, "genre": {"시": 1.0}}
+    books = [
+        # 사용자 벡터에 없는 kdc / genre, 성별 비율 없음
+        {"kdc": "역사", "genre": "경제", "from_age": 0, "to_age": 10, "gender_ratio": {}},
+        # 사용자 성별만 비율 없음
+        {"kdc": "문학", "genre": "시", "from_age": 30, "to_age": 30, "gender_ratio": {"M": 0.9}},
+        {"kdc": "문학", "genre": "에세이", "from_age": 20, "to_age": 40, "gender_ratio": {"F": 0.2, "M": 0.8}},
+    ]
+
+    scores = batch_recommendation_scores(user, BookColumns.from_books(books))
+
+    assert scores.tolist() == pytest.approx([recommendation_score(user, book) for book in books], abs=1e-12)
+
+
+def test_empty_input():
+    user = make_user(random.Random(0))
+    columns = BookColumns.from_books([])
+
+    assert len(columns) == 0
+    assert batch_recommendation_scores(user, columns).shape == (0,)
+
+    indices, scores = top_k_books(user, columns, 5)
+    assert indices.shape == (0,)
+    assert scores.shape == (0,)
+
+
+@pytest.mark.parametrize("k", [0, 1, 10, 1000])
+def test_top_k_books_ordering(k):
+    rng = random.Random(k)
+    books = [make_book(rng) for _ in range(300)]
+    user = make_user(rng)
+
+    indices, scores = top_k_books(user, BookColumns.from_books(books), k)
+
+    expected = sorted(range(len(books)), key=lambda i: -recommendation_score(user, books[i]))[:k]
+    assert len(indices) == min(k, len(books))
+    assert np.all(np.diff(scores) <= 0)
+    # 동점은 순서가 달라질 수 있으므로 점수로 비교
+    assert scores.tolist() == pytest.approx([recommendation_score(user, books[i]) for i in expected], abs=1e-12)
+    assert scores.tolist() == pytest.approx([recommendation_score(user, books[i]) for i in indices.tolist()], abs=1e-12)
@@ -0,0 +1,192 @@
+# user/api_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 프로젝트 루트의 cache/ 디렉터리에 저장 (osmnx HTTP 캐시와 같은 위치)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "api_cache.sqlite3")
+
+
+def make_cache_key(namespace, params, ignore=("authKey",)):
+    """
+    API 파라미터를 정규화하여 캐시 키 생성
+
+    Args:
+        namespace: 엔드포인트 이름 (예: "loanItemSrch")
+        params: 요청 파라미터 dict
+        ignore: 키 계산에서 제외할 파라미터 (인증키 등)
+
+    Returns:
+        str: sha1 해시 키
+    """
+    normalized = {
+        str(k): json.dumps(v, sort_keys=True, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)
+        for k, v in params.items()
+        if k not in ignore and v is not None and v != ""
+    }
+    raw = json.dumps([namespace, normalized], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    디스크(SQLite) 기반 API 응답 캐시
+
+    - ttl 이내: 캐시 값을 그대로 반환
+    - ttl ~ ttl + stale_ttl: 오래된 값을 즉시 반환하고 백그라운드에서 갱신
+    - 그 이후: 동기적으로 다시 조회
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=3600, stale_ttl=86400, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+
+    def _connect(self):
+        # Streamlit 세션은 각각 다른 스레드에서 실행되므로 호출마다 연결
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        """
+        캐시 조회
+
+        Returns:
+            tuple: (값, 저장 후 경과 시간(초)) 또는 None
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+        value, created_at = row
+        return json.loads(value), now - created_at
+
+    def set(self, key, value):
+        """캐시 저장 후 용량 초과 시 LRU 삭제"""
+        raw = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, raw, len(raw.encode("utf-8")), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def get_or_fetch(self, key, fetch, cacheable=None):
+        """
+        캐시 우선 조회 (stale-while-revalidate)
+
+        Args:
+            key: 캐시 키
+            fetch: 인자 없는 조회 함수 (원본 API 호출)
+            cacheable: 응답을 저장할지 판단하는 함수 (None이면 항상 저장)
+
+        Returns:
+            fetch()가 반환하는 값 (캐시 또는 신규)
+        """
+        cached = self.get(key)
+
+        if cached is not None:
+            value, age = cached
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background(key, fetch, cacheable)
+                return value
+
+        value = fetch()
+        if value is not None and (cacheable is None or cacheable(value)):
+            self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, fetch, cacheable):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if value is not None and (cacheable is None or cacheable(value)):
+                    self.set(key, value)
+            except Exception:
+                # 갱신 실패 시 기존 값을 유지하고 다음 요청에서 다시 시도
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+_book_cache = None
+_book_cache_lock = threading.Lock()
+
+
+def get_book_cache():
+    """
+    정보나루 응답 공용 캐시
+
+    Streamlit은 재실행마다 스크립트를 다시 실행하므로 앱에서 직접 만들면 매번 새 인스턴스가 된다.
+    모듈에 하나만 두어 재실행·세션 간에 백그라운드 갱신 중복 방지(_refreshing)를 공유한다.
+    """
+    global _book_cache
+    if _book_cache is None:
+        with _book_cache_lock:
+            if _book_cache is None:
+                from config import BOOK_CACHE_TTL, BOOK_CACHE_STALE_TTL, BOOK_CACHE_MAX_BYTES
+
+                _book_cache = ResponseCache(
+                    ttl=BOOK_CACHE_TTL,
+                    stale_ttl=BOOK_CACHE_STALE_TTL,
+                    max_bytes=BOOK_CACHE_MAX_BYTES,
+                )
+    return _book_cache
@@ -0,0 +1,101 @@
+# user/book_pager.py
+
+from itertools import islice
+
+
+class BookPager:
+    """
+    페이지 단위로 도서를 지연 조회하는 페이저
+
+    필요한 만큼만 다음 페이지를 요청하고, 이미 받은 페이지는 다시 요청하지 않는다.
+    """
+
+    def __init__(self, fetch_page, page_size=10, key=None):
+        """
+        Args:
+            fetch_page: (page_no, page_size) -> (books, error) 조회 함수
+            page_size: 한 페이지의 도서 수
+            key: 중복 제거용 키 함수 (여러 질의를 합친 페이지는 페이지 간 중복 가능)
+        """
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.key = key
+        self.pages = {}
+        self.exhausted = False
+        self.error = None
+
+        # 1페이지부터 연속으로 받은 페이지를 중복 제거해 이어 붙인 목록
+        self.books = []
+        self._seen = set()
+        self._merged_pages = 0
+
+    def page(self, page_no):
+        """
+        페이지 조회 (캐시 우선)
+
+        Returns:
+            list: 해당 페이지의 도서 리스트 (오류 시 빈 리스트)
+        """
+        if page_no in self.pages:
+            return self.pages[page_no]
+
+        if self.exhausted:
+            return []
+
+        books, error = self.fetch_page(page_no, self.page_size)
+        if error:
+            # 오류는 캐시하지 않고 다음 요청에서 다시 시도
+            self.error = error
+            return []
+
+        self.error = None
+        books = books or []
+        self.pages[page_no] = books
+
+        # 페이지가 덜 찼으면 마지막 페이지 (합친 페이지도 질의 중 하나라도 가득 찼으면 page_size 이상)
+        if len(books) < self.page_size:
+            self.exhausted = True
+
+        self._merge()
+        return books
+
+    def _merge(self):
+        """연속으로 받은 페이지를 순서대로 중복 제거 목록에 추가"""
+        while self._merged_pages + 1 in self.pages:
+            self._merged_pages += 1
+            added = 0
+            for book in self.pages[self._merged_pages]:
+                if self.key is not None:
+                    book_key = self.key(book)
+                    if book_key in self._seen:
+                        continue
+                    self._seen.add(book_key)
+                self.books.append(book)
+                added += 1
+
+            # 새 도서가 하나도 없는 페이지 이후는 조회하지 않음
+            if not added:
+                self.exhausted = True
+
+    def __iter__(self):
+        """중복을 뺀 도서를 한 권씩 반환하며, 필요할 때만 다음 페이지를 조회"""
+        i = 0
+        while True:
+            while i < len(self.books):
+                yield self.books[i]
+                i += 1
+            if self.exhausted or not self.page(self._merged_pages + 1):
+                return
+
+    def take(self, count):
+        """앞에서부터 count권 (필요한 페이지까지만 조회)"""
+        return list(islice(iter(self), count))
+
+    @property
+    def loaded_count(self):
+        """지금까지 받은 도서 수 (중복 제외)"""
+        return len(self.books)
+
+    def has_more(self, count):
+        """count권 이후에 도서가 더 있을 수 있는지"""
+        return count < self.loaded_count or not self.exhausted
@@ -0,0 +1,366 @@
+# user/contraction.py
+#
+# Contraction Hierarchies (CH) 전처리 및 질의
+#
+# 전처리: python -m user.contraction [graph_id ...]   (인자가 없으면 캐시된 모든 그래프)
+#   → cache/graphs/<graph_id>.ch.npz
+# 질의: 상향(rank가 높아지는) 엣지만 따라가는 양방향 Dijkstra 후
+#       지름길(shortcut)을 중간 노드로 재귀적으로 풀어 실제 노드 경로를 만든다.
+
+import argparse
+import heapq
+import math
+import os
+import time
+
+import numpy as np
+
+# 지름길 필요 여부를 확인하는 witness 탐색의 최대 확정 노드 수
+WITNESS_SETTLE_LIMIT = 500
+# 노드 우선순위 계산용 (빠른 근사)
+PRIORITY_SETTLE_LIMIT = 50
+
+
+class ContractionHierarchy:
+    """
+    CH 질의 구조
+
+    fwd: rank가 낮은 노드 → 높은 노드 엣지 (정방향 탐색용 CSR)
+    bwd: 원래 엣지 u→w 중 rank[u] > rank[w]인 것을 w→u로 저장 (역방향 탐색용 CSR)
+    shortcuts: {(u, w): 중간 노드} 지름길 풀기용
+    """
+
+    def __init__(self, node_ids, rank, fwd, bwd, shortcut_u, shortcut_w, shortcut_mid):
+        self.node_ids = node_ids
+        self.rank = rank
+        self.fwd = fwd  # (offsets, targets, weights)
+        self.bwd = bwd
+        self.shortcut_u = shortcut_u
+        self.shortcut_w = shortcut_w
+        self.shortcut_mid = shortcut_mid
+
+        self.index = {node: i for i, node in enumerate(node_ids.tolist())}
+        self.shortcuts = dict(zip(zip(shortcut_u.tolist(), shortcut_w.tolist()), shortcut_mid.tolist()))
+        self._fwd_lists = tuple(a.tolist() for a in fwd)
+        self._bwd_lists = tuple(a.tolist() for a in bwd)
+
+    @property
+    def num_shortcuts(self):
+        return len(self.shortcut_u)
+
+    @property
+    def nbytes(self):
+        arrays = (self.node_ids, self.rank, self.shortcut_u, self.shortcut_w, self.shortcut_mid) + self.fwd + self.bwd
+        return sum(a.nbytes for a in arrays) + (self.num_nodes + self.num_shortcuts) * 100
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            node_ids=self.node_ids,
+            rank=self.rank,
+            fwd_offsets=self.fwd[0], fwd_targets=self.fwd[1], fwd_weights=self.fwd[2],
+            bwd_offsets=self.bwd[0], bwd_targets=self.bwd[1], bwd_weights=self.bwd[2],
+            shortcut_u=self.shortcut_u, shortcut_w=self.shortcut_w, shortcut_mid=self.shortcut_mid,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["node_ids"],
+                data["rank"],
+                (data["fwd_offsets"], data["fwd_targets"], data["fwd_weights"]),
+                (data["bwd_offsets"], data["bwd_targets"], data["bwd_weights"]),
+                data["shortcut_u"], data["shortcut_w"], data["shortcut_mid"],
+            )
+
+    def _unpack(self, path):
+        # 지름길 (u, w)를 (u, mid), (mid, w)로 재귀적으로 분해
+        result = [path[0]]
+        for u, w in zip(path, path[1:]):
+            stack = [(u, w)]
+            while stack:
+                a, b = stack.pop()
+                mid = self.shortcuts.get((a, b))
+                if mid is None:
+                    result.append(b)
+                else:
+                    stack.append((mid, b))
+                    stack.append((a, mid))
+        return result
+
+    def query(self, source, target):
+        """
+        CH 최단 경로 질의
+
+        Returns:
+            tuple: (OSM 노드 경로, 거리, 실행시간(초), 탐색 노드 수)
+        """
+        s, t = self.index[source], self.index[target]
+
+        start_time = time.time()
+
+        if s == t:
+            return [int(self.node_ids[s])], 0, time.time() - start_time, 1
+
+        # 0: 정방향(fwd), 1: 역방향(bwd) - 탐색 공간이 작으므로 dict 사용
+        adjacency = (self._fwd_lists, self._bwd_lists)
+        dist = ({s: 0}, {t: 0})
+        pred = ({s: -1}, {t: -1})
+        settled = (set(), set())
+        heaps = ([(0, s)], [(0, t)])
+
+        mu = math.inf
+        meeting = -1
+        nodes_visited = 0
+        side = 0
+
+        while heaps[0] or heaps[1]:
+            # 각 방향은 최소 키가 mu 이상이면 더 볼 필요 없음
+            if not heaps[side] or heaps[side][0][0] >= mu:
+                if not heaps[1 - side] or heaps[1 - side][0][0] >= mu:
+                    break
+                side = 1 - side
+                continue
+
+            d, current = heapq.heappop(heaps[side])
+            if current in settled[side] or d > dist[side][current]:
+                side = 1 - side
+                continue
+
+            settled[side].add(current)
+            nodes_visited += 1
+
+            other_d = dist[1 - side].get(current)
+            if other_d is not None and d + other_d < mu:
+                mu = d + other_d
+                meeting = current
+
+            offsets, targets, weights = adjacency[side]
+            ds, ps = dist[side], pred[side]
+            for e in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                new_d = d + weights[e]
+                if new_d < ds.get(neighbor, math.inf):
+                    ds[neighbor] = new_d
+                    ps[neighbor] = current
+                    heapq.heappush(heaps[side], (new_d, neighbor))
+
+            side = 1 - side
+
+        if meeting < 0:
+            return None, None, None, None
+
+        forward = [meeting]
+        while pred[0][forward[-1]] != -1:
+            forward.append(pred[0][forward[-1]])
+        forward.reverse()
+
+        backward = []
+        node = meeting
+        while pred[1][node] != -1:
+            node = pred[1][node]
+            backward.append(node)
+
+        path = self._unpack(forward + backward)
+
+        end_time = time.time()
+        return [int(self.node_ids[i]) for i in path], mu, end_time - start_time, nodes_visited
+
+
+def ch_path(G, source, target, hierarchy):
+    """다른 탐색 함수와 같은 형태의 CH 질의 (G는 사용하지 않음, 계층은 같은 그래프에서 전처리한 것)"""
+    return hierarchy.query(source, target)
+
+
+def build_hierarchy(csr, witness_limit=WITNESS_SETTLE_LIMIT, priority_limit=PRIORITY_SETTLE_LIMIT):
+    """
+    CSRGraph로부터 Contraction Hierarchy 생성 (오프라인, 수 분 걸릴 수 있음)
+
+    노드 순서: 지름길 수 - 엣지 수 + 이미 수축된 이웃 수 (lazy update)
+
+    Returns:
+        ContractionHierarchy
+    """
+    n = csr.num_nodes
+    out = [dict() for _ in range(n)]
+    inn = [dict() for _ in range(n)]
+
+    # 평행 엣지는 최소 길이만 유지
+    for u, v, w in zip(csr.sources().tolist(), csr.targets.tolist(), csr.weights.tolist()):
+        if u != v and w < out[u].get(v, math.inf):
+            out[u][v] = w
+            inn[v][u] = w
+
+    # 최종 엣지 집합 {(u, w): (길이, 중간 노드 또는 -1)}
+    edges = {(u, v): (w, -1) for u in range(n) for v, w in out[u].items()}
+
+    contracted = bytearray(n)
+    deleted_neighbors = [0] * n
+
+    def witness_search(source, goals, skip, limit, max_settled):
+        # v(skip)를 거치지 않는 source → goals 최단 거리 (제한된 Dijkstra)
+        dist = {source: 0}
+        heap = [(0, source)]
+        remaining = set(goals)
+        settled_count = 0
+        while heap and remaining:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            if d > limit:
+                break
+            remaining.discard(x)
+            settled_count += 1
+            if settled_count > max_settled:
+                break
+            for y, w in out[x].items():
+                if y == skip:
+                    continue
+                nd = d + w
+                if nd < dist.get(y, math.inf):
+                    dist[y] = nd
+                    heapq.heappush(heap, (nd, y))
+        return dist
+
+    def shortcuts_for(v, max_settled):
+        shortcuts = []
+        for u, length_in in inn[v].items():
+            goals = {w: length_in + length_out for w, length_out in out[v].items() if w != u}
+            if not goals:
+                continue
+            dist = witness_search(u, goals, v, max(goals.values()), max_settled)
+            for w, via in goals.items():
+                if dist.get(w, math.inf) > via:
+                    shortcuts.append((u, w, via))
+        return shortcuts
+
+    def priority(v):
+        return len(shortcuts_for(v, priority_limit)) - len(inn[v]) - len(out[v]) + deleted_neighbors[v]
+
+    heap = [(priority(v), v) for v in range(n)]
+    heapq.heapify(heap)
+
+    rank = np.zeros(n, dtype=np.int32)
+    order = 0
+
+    while heap:
+        _, v = heapq.heappop(heap)
+        if contracted[v]:
+            continue
+
+        # lazy update: 우선순위가 바뀌었으면 다시 넣기
+        new_priority = priority(v)
+        if heap and new_priority > heap[0][0]:
+            heapq.heappush(heap, (new_priority, v))
+            continue
+
+        for u, w, length in shortcuts_for(v, witness_limit):
+            if length < out[u].get(w, math.inf):
+                out[u][w] = length
+                inn[w][u] = length
+                edges[(u, w)] = (length, v)
+
+        contracted[v] = 1
+        rank[v] = order
+        order += 1
+
+        for u in inn[v]:
+            del out[u][v]
+            deleted_neighbors[u] += 1
+        for w in out[v]:
+            del inn[w][v]
+            deleted_neighbors[w] += 1
+        out[v] = {}
+        inn[v] = {}
+
+    # 상향 그래프 구성
+    rank_list = rank.tolist()
+    fwd_u, fwd_v, fwd_w = [], [], []
+    bwd_u, bwd_v, bwd_w = [], [], []
+    shortcut_u, shortcut_w, shortcut_mid = [], [], []
+
+    for (u, w), (length, mid) in edges.items():
+        if rank_list[u] < rank_list[w]:
+            fwd_u.append(u)
+            fwd_v.append(w)
+            fwd_w.append(length)
+        else:
+            bwd_u.append(w)
+            bwd_v.append(u)
+            bwd_w.append(length)
+        if mid >= 0:
+            shortcut_u.append(u)
+            shortcut_w.append(w)
+            shortcut_mid.append(mid)
+
+    return ContractionHierarchy(
+        csr.node_ids,
+        rank,
+        _csr_arrays(n, fwd_u, fwd_v, fwd_w),
+        _csr_arrays(n, bwd_u, bwd_v, bwd_w),
+        np.array(shortcut_u, dtype=np.int32),
+        np.array(shortcut_w, dtype=np.int32),
+        np.array(shortcut_mid, dtype=np.int32),
+    )
+
+
+def _csr_arrays(n, src, dst, weight):
+    """엣지 목록 → (offsets, targets, weights), 지름길 길이는 누적 오차를 줄이기 위해 float64 유지"""
+    src = np.array(src, dtype=np.int32)
+    order = np.argsort(src, kind="stable")
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+
+    return offsets, np.array(dst, dtype=np.int32)[order], np.array(weight, dtype=np.float64)[order]
+
+
+def hierarchy_path(graph_id):
+    from user.graph_cache import GRAPH_CACHE_DIR
+
+    return os.path.join(GRAPH_CACHE_DIR, f"{graph_id}.ch.npz")
+
+
+def load_hierarchy(graph_id, csr=None):
+    """
+    저장된 CH (메모리 LRU 우선)
+
+    전처리되지 않았거나, csr을 주었는데 노드 구성이 다르면(같은 graph_id로 그래프를 다시 만든 경우) None
+    """
+    from user.graph_cache import graph_lru
+
+    key = f"{graph_id}:ch"
+    ch = graph_lru.get(key)
+    if ch is None:
+        path = hierarchy_path(graph_id)
+        if not os.path.exists(path):
+            return None
+        ch = ContractionHierarchy.load(path)
+        graph_lru.put(key, ch, ch.nbytes)
+    if csr is not None and not np.array_equal(ch.node_ids, csr.node_ids):
+        return None
+    return ch
+
+
+def main():
+    from user.graph_cache import get_csr, load_index
+
+    parser = argparse.ArgumentParser(description="캐시된 보행자 그래프의 Contraction Hierarchy 전처리")
+    parser.add_argument("graph_ids", nargs="*", help="전처리할 graph_id (없으면 전체)")
+    args = parser.parse_args()
+
+    for graph_id in args.graph_ids or list(load_index()):
+        csr = get_csr(graph_id)
+        start = time.time()
+        ch = build_hierarchy(csr)
+        ch.save(hierarchy_path(graph_id))
+        print(f"{graph_id}: 노드 {csr.num_nodes}, 지름길 {ch.num_shortcuts}, {time.time() - start:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
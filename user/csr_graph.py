@@ -0,0 +1,98 @@
+# user/csr_graph.py
+
+import numpy as np
+
+
+class CSRGraph:
+    """
+    압축 희소 행(CSR) 배열 기반 방향 그래프
+
+    노드 i의 이웃: targets[offsets[i]:offsets[i + 1]], 가중치: weights[같은 범위]
+    노드 번호는 0..n-1 인덱스이며 node_ids[i]가 원래 OSM 노드 ID
+    """
+
+    def __init__(self, node_ids, x, y, offsets, targets, weights, index=None):
+        self.node_ids = node_ids    # int64 (n)
+        self.x = x                  # float64 (n) 경도
+        self.y = y                  # float64 (n) 위도
+        self.offsets = offsets      # int64 (n + 1)
+        self.targets = targets      # int32 (m)
+        self.weights = weights      # float32 (m)
+
+        self.index = index if index is not None else {node: i for i, node in enumerate(node_ids.tolist())}
+        self._lists = None
+        self._reverse = None
+
+    @classmethod
+    def from_arrays(cls, node_ids, x, y, edge_u, edge_v, edge_length, index=None):
+        """엣지 목록(노드 인덱스) → CSR"""
+        n = len(node_ids)
+        order = np.argsort(edge_u, kind="stable")
+        counts = np.bincount(edge_u, minlength=n)
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(
+            np.asarray(node_ids, dtype=np.int64),
+            np.asarray(x, dtype=np.float64),
+            np.asarray(y, dtype=np.float64),
+            offsets,
+            np.asarray(edge_v, dtype=np.int32)[order],
+            np.asarray(edge_length, dtype=np.float32)[order],
+            index,
+        )
+
+    @classmethod
+    def from_networkx(cls, G, weight="length"):
+        """osmnx 그래프 → CSR (평행 엣지는 모두 유지, 탐색 시 최소값이 선택됨)"""
+        from user.graph_cache import graph_to_arrays
+
+        arrays = graph_to_arrays(G, weight)
+        return cls.from_arrays(
+            arrays["node_ids"], arrays["x"], arrays["y"],
+            arrays["edge_u"], arrays["edge_v"], arrays["edge_length"],
+        )
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        arrays = (self.node_ids, self.x, self.y, self.offsets, self.targets, self.weights)
+        # index dict는 노드당 약 100바이트로 추정
+        return sum(a.nbytes for a in arrays) + self.num_nodes * 100
+
+    def sources(self):
+        """엣지별 출발 노드 인덱스 (targets와 같은 순서)"""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.offsets))
+
+    def reverse(self):
+        """모든 엣지 방향을 뒤집은 그래프 (역방향 탐색용, 한 번만 생성)"""
+        if self._reverse is None:
+            reverse = CSRGraph.from_arrays(
+                self.node_ids, self.x, self.y, self.targets, self.sources(), self.weights, self.index
+            )
+            reverse._reverse = self
+            self._reverse = reverse
+        return self._reverse
+
+    def lists(self):
+        """
+        탐색 루프용 파이썬 리스트 (offsets, targets, weights)
+
+        NumPy 원소 단위 접근은 파이썬 루프에서 느리므로 한 번 변환해 재사용
+        """
+        if self._lists is None:
+            self._lists = (self.offsets.tolist(), self.targets.tolist(), self.weights.tolist())
+        return self._lists
+
+    def to_node_ids(self, path):
+        """인덱스 경로 → OSM 노드 ID 경로"""
+        node_ids = self.node_ids
+        return [int(node_ids[i]) for i in path]
@@ -0,0 +1,265 @@
+# user/graph_cache.py
+#
+# 보행자 도로 네트워크 그래프 캐시
+#
+# - 디스크: cache/graphs/<graph_id>.npz (노드 좌표 + 엣지 배열) + index.json (bbox 목록)
+# - 메모리: 모든 Streamlit 세션이 공유하는 LRU (메모리 예산 기준)
+# 요청 영역을 완전히 포함하는 그래프가 이미 있으면 다운로드 없이 재사용한다.
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import networkx as nx
+import numpy as np
+
+GRAPH_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "cache",
+    "graphs",
+)
+
+# 메모리 LRU 예산 (바이트)
+GRAPH_CACHE_MAX_BYTES = int(os.getenv("GRAPH_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# 1도당 거리 (미터, 위도 방향)
+METERS_PER_DEGREE = 111320.0
+
+
+class MemoryLRU:
+    """메모리 예산(바이트)으로 제한되는 스레드 안전 LRU"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+
+            # 예산 초과 시 가장 오래 사용하지 않은 항목부터 제거 (방금 넣은 항목은 유지)
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def used_bytes(self):
+        return self._bytes
+
+
+graph_lru = MemoryLRU(GRAPH_CACHE_MAX_BYTES)
+
+_index_lock = threading.Lock()
+
+
+def bbox_from_point(lat, lon, dist):
+    """
+    중심점과 거리로 경계 상자 계산 (osmnx graph_from_point의 bbox 방식과 동일한 범위)
+
+    Returns:
+        tuple: (south, west, north, east)
+    """
+    delta_lat = dist / METERS_PER_DEGREE
+    delta_lon = dist / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+    return lat - delta_lat, lon - delta_lon, lat + delta_lat, lon + delta_lon
+
+
+def bbox_covers(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+def bbox_area(bbox):
+    return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+
+
+def make_graph_id(bbox, network_type):
+    raw = json.dumps([[round(v, 6) for v in bbox], network_type])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def estimate_graph_bytes(G):
+    # networkx 그래프는 노드/엣지마다 dict를 가지므로 대략적인 추정치 사용
+    return G.number_of_nodes() * 500 + G.number_of_edges() * 700
+
+
+def _graph_path(graph_id):
+    return os.path.join(GRAPH_CACHE_DIR, f"{graph_id}.npz")
+
+
+def _index_path():
+    return os.path.join(GRAPH_CACHE_DIR, "index.json")
+
+
+def load_index():
+    """디스크에 저장된 그래프 목록 {graph_id: {"bbox", "network_type", ...}}"""
+    try:
+        with open(_index_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def find_covering(bbox, network_type):
+    """요청 영역을 포함하는 저장된 그래프 중 가장 작은 것의 graph_id (없으면 None)"""
+    candidates = [
+        (bbox_area(entry["bbox"]), graph_id)
+        for graph_id, entry in load_index().items()
+        if entry["network_type"] == network_type
+        and bbox_covers(entry["bbox"], bbox)
+        and os.path.exists(_graph_path(graph_id))
+    ]
+    return min(candidates)[1] if candidates else None
+
+
+def graph_to_arrays(G, weight="length"):
+    """
+    osmnx 그래프 → 압축 배열
+
+    Returns:
+        dict: node_ids(int64), x/y(float64), edge_u/edge_v(int32, 노드 인덱스), edge_length(float32)
+    """
+    node_ids = np.fromiter(G.nodes, dtype=np.int64, count=G.number_of_nodes())
+    index = {node: i for i, node in enumerate(node_ids.tolist())}
+    x = np.array([G.nodes[node]["x"] for node in node_ids.tolist()], dtype=np.float64)
+    y = np.array([G.nodes[node]["y"] for node in node_ids.tolist()], dtype=np.float64)
+
+    edges = list(G.edges(data=weight, default=1))
+    edge_u = np.array([index[u] for u, _, _ in edges], dtype=np.int32)
+    edge_v = np.array([index[v] for _, v, _ in edges], dtype=np.int32)
+    edge_length = np.array([w for _, _, w in edges], dtype=np.float32)
+
+    return {"node_ids": node_ids, "x": x, "y": y, "edge_u": edge_u, "edge_v": edge_v, "edge_length": edge_length}
+
+
+def arrays_to_graph(arrays):
+    """압축 배열 → osmnx 호환 MultiDiGraph (위경도 좌표계)"""
+    G = nx.MultiDiGraph(crs="epsg:4326")
+    node_ids = arrays["node_ids"].tolist()
+    G.add_nodes_from(
+        (node, {"x": x, "y": y})
+        for node, x, y in zip(node_ids, arrays["x"].tolist(), arrays["y"].tolist())
+    )
+    G.add_edges_from(
+        (node_ids[u], node_ids[v], {"length": length})
+        for u, v, length in zip(arrays["edge_u"].tolist(), arrays["edge_v"].tolist(), arrays["edge_length"].tolist())
+    )
+    return G
+
+
+def save_graph(G, bbox, network_type, graph_id=None):
+    """그래프를 디스크에 저장하고 index.json에 등록"""
+    graph_id = graph_id or make_graph_id(bbox, network_type)
+    os.makedirs(GRAPH_CACHE_DIR, exist_ok=True)
+
+    np.savez_compressed(_graph_path(graph_id), **graph_to_arrays(G))
+
+    with _index_lock:
+        index = load_index()
+        index[graph_id] = {
+            "bbox": list(bbox),
+            "network_type": network_type,
+            "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(),
+            "created_at": time.time(),
+        }
+        tmp_path = _index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, _index_path())
+
+    return graph_id
+
+
+def load_arrays(graph_id):
+    with np.load(_graph_path(graph_id)) as data:
+        return {key: data[key] for key in data.files}
+
+
+def load_graph(graph_id):
+    """디스크에서 그래프 로드 (메모리 LRU 우선)"""
+    G = graph_lru.get(graph_id)
+    if G is None:
+        G = arrays_to_graph(load_arrays(graph_id))
+        graph_lru.put(graph_id, G, estimate_graph_bytes(G))
+    return G
+
+
+def get_graph(center_lat, center_lon, dist, network_type="walk"):
+    """
+    중심점 주변 보행자 네트워크 (캐시 우선)
+
+    1. 요청 영역을 포함하는 저장된 그래프가 있으면 재사용 (메모리 LRU → 디스크)
+    2. 없으면 OSM에서 다운로드 후 저장
+
+    Args:
+        center_lat, center_lon: 중심점 위도, 경도
+        dist: 중심점으로부터의 거리 (미터)
+        network_type: osmnx network_type
+
+    Returns:
+        tuple: (graph_id, networkx.MultiDiGraph, 캐시 사용 여부)
+    """
+    bbox = bbox_from_point(center_lat, center_lon, dist)
+
+    graph_id = find_covering(bbox, network_type)
+    if graph_id is not None:
+        return graph_id, load_graph(graph_id), True
+
+    import osmnx as ox
+
+    G = ox.graph_from_point((center_lat, center_lon), dist=dist, network_type=network_type)
+    graph_id = save_graph(G, bbox, network_type)
+    graph_lru.put(graph_id, G, estimate_graph_bytes(G))
+    return graph_id, G, False
+
+
+def get_csr(graph_id, G=None):
+    """
+    그래프의 CSR 배열 표현 (메모리 LRU에서 그래프별로 공유)
+
+    Args:
+        graph_id: 그래프 ID
+        G: 이미 로드한 networkx 그래프 (없으면 디스크 배열에서 바로 생성)
+
+    Returns:
+        CSRGraph
+    """
+    from user.csr_graph import CSRGraph
+
+    key = f"{graph_id}:csr"
+    csr = graph_lru.get(key)
+    if csr is None:
+        if G is not None:
+            csr = CSRGraph.from_networkx(G)
+        else:
+            arrays = load_arrays(graph_id)
+            csr = CSRGraph.from_arrays(
+                arrays["node_ids"], arrays["x"], arrays["y"],
+                arrays["edge_u"], arrays["edge_v"], arrays["edge_length"],
+            )
+        graph_lru.put(key, csr, csr.nbytes)
+    return csr
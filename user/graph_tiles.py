@@ -0,0 +1,286 @@
+# user/graph_tiles.py
+#
+# 고정 격자 타일 단위 보행자 그래프 저장소
+#
+# - 디스크: cache/graphs/tiles/<network_type>/<ix>_<iy>.npz (타일별 노드 + 출발 노드가 타일 안에 있는 엣지)
+# - 메모리: 모든 Streamlit 세션이 공유하는 타일 LRU (메모리 예산 기준)
+# 경로 질의는 출발지-도착지 구간(corridor)에 걸친 타일만 읽어 하나의 그래프로 이어 붙인다.
+# 타일 경계를 넘는 엣지의 도착 노드 좌표는 타일에 함께 저장하므로 이웃 타일 없이도 엣지가 끊기지 않는다.
+#
+# 로컬 Overpass 데이터로 타일 채우기: python -m user.graph_tiles --from-overpass
+
+import argparse
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from user.graph_cache import (
+    GRAPH_CACHE_DIR, METERS_PER_DEGREE, MemoryLRU, arrays_to_graph, bbox_covers, estimate_graph_bytes, graph_lru,
+)
+
+TILE_DIR = os.path.join(GRAPH_CACHE_DIR, "tiles")
+
+# 타일 한 변 (도). 0.01도 ≈ 위도 1.1km, 서울 부근 경도 0.9km
+TILE_SIZE_DEG = float(os.getenv("GRAPH_TILE_SIZE_DEG", 0.01))
+
+# 타일 LRU 예산 (바이트)
+TILE_CACHE_MAX_BYTES = int(os.getenv("GRAPH_TILE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# 구간 양옆으로 포함할 폭 (미터)
+CORRIDOR_WIDTH_M = 500
+
+tile_lru = MemoryLRU(TILE_CACHE_MAX_BYTES)
+
+
+def tile_key(lat, lon):
+    """좌표가 속한 타일 (ix, iy)"""
+    return math.floor(lon / TILE_SIZE_DEG), math.floor(lat / TILE_SIZE_DEG)
+
+
+def tile_bbox(key):
+    """
+    Returns:
+        tuple: (south, west, north, east)
+    """
+    ix, iy = key
+    return iy * TILE_SIZE_DEG, ix * TILE_SIZE_DEG, (iy + 1) * TILE_SIZE_DEG, (ix + 1) * TILE_SIZE_DEG
+
+
+def _tile_path(key, network_type):
+    return os.path.join(TILE_DIR, network_type, f"{key[0]}_{key[1]}.npz")
+
+
+def _tile_bytes(tile):
+    return sum(a.nbytes for a in tile.values())
+
+
+def _empty_tile():
+    return {
+        "node_ids": np.zeros(0, dtype=np.int64), "x": np.zeros(0), "y": np.zeros(0),
+        "foreign_ids": np.zeros(0, dtype=np.int64), "foreign_x": np.zeros(0), "foreign_y": np.zeros(0),
+        "edge_u": np.zeros(0, dtype=np.int64), "edge_v": np.zeros(0, dtype=np.int64),
+        "edge_length": np.zeros(0, dtype=np.float32),
+    }
+
+
+def corridor_tiles(points, width=CORRIDOR_WIDTH_M):
+    """
+    첫 번째 지점에서 나머지 각 지점까지의 선분으로부터 width 이내에 걸치는 타일 목록
+
+    Args:
+        points: [(lat, lon), ...] 첫 번째가 출발지
+        width: 선분 양옆 폭 (미터)
+
+    Returns:
+        list: 정렬된 타일 키
+    """
+    origin_lat, origin_lon = points[0]
+    meters_per_lon = METERS_PER_DEGREE * math.cos(math.radians(origin_lat))
+    # 타일 중심에서 모서리까지 거리만큼 여유를 두면 선분에 닿는 타일이 빠지지 않음
+    half_diagonal = math.hypot(TILE_SIZE_DEG * meters_per_lon, TILE_SIZE_DEG * METERS_PER_DEGREE) / 2
+
+    def to_xy(lat, lon):
+        return (lon - origin_lon) * meters_per_lon, (lat - origin_lat) * METERS_PER_DEGREE
+
+    keys = set()
+    for lat, lon in points[1:] or points[:1]:
+        bx, by = to_xy(lat, lon)
+        length_sq = bx * bx + by * by
+
+        margin_lat = width / METERS_PER_DEGREE
+        margin_lon = width / meters_per_lon
+        ix0, iy0 = tile_key(min(origin_lat, lat) - margin_lat, min(origin_lon, lon) - margin_lon)
+        ix1, iy1 = tile_key(max(origin_lat, lat) + margin_lat, max(origin_lon, lon) + margin_lon)
+
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                south, west, north, east = tile_bbox((ix, iy))
+                px, py = to_xy((south + north) / 2, (west + east) / 2)
+                # 타일 중심에서 선분까지 거리
+                t = 0.0 if length_sq == 0 else min(1.0, max(0.0, (px * bx + py * by) / length_sq))
+                if math.hypot(px - t * bx, py - t * by) <= width + half_diagonal:
+                    keys.add((ix, iy))
+
+    return sorted(keys)
+
+
+def split_tiles(arrays, keys=None):
+    """
+    그래프 배열 (graph_cache.graph_to_arrays 형식) → {타일 키: 타일}
+
+    엣지는 출발 노드가 속한 타일에 저장하고, 다른 타일에 있는 도착 노드는 foreign_*에 좌표를 둔다.
+    keys를 주면 해당 타일만 만들며 노드가 없는 타일은 빈 타일로 만든다.
+    """
+    node_ids, x, y = arrays["node_ids"], arrays["x"], arrays["y"]
+    edge_u, edge_v = arrays["edge_u"], arrays["edge_v"]
+
+    ix = np.floor(x / TILE_SIZE_DEG).astype(np.int64)
+    iy = np.floor(y / TILE_SIZE_DEG).astype(np.int64)
+    node_tiles, inverse = np.unique(np.stack([ix, iy], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    edge_tile = inverse[edge_u]
+
+    tiles = {}
+    for group, (tx, ty) in enumerate(node_tiles.tolist()):
+        key = (tx, ty)
+        if keys is not None and key not in keys:
+            continue
+
+        owned = inverse == group
+        edges = edge_tile == group
+        targets = edge_v[edges]
+        foreign = np.unique(targets[~owned[targets]])
+
+        tiles[key] = {
+            "node_ids": node_ids[owned], "x": x[owned], "y": y[owned],
+            "foreign_ids": node_ids[foreign], "foreign_x": x[foreign], "foreign_y": y[foreign],
+            "edge_u": node_ids[edge_u[edges]], "edge_v": node_ids[targets],
+            "edge_length": arrays["edge_length"][edges].astype(np.float32),
+        }
+
+    for key in keys or ():
+        tiles.setdefault(key, _empty_tile())
+
+    return tiles
+
+
+def stitch_tiles(tiles):
+    """
+    타일 목록 → 하나의 그래프 배열 (graph_cache.graph_to_arrays 형식)
+
+    노드는 OSM ID로 중복 제거하며, 불러오지 않은 이웃 타일의 노드는 foreign 좌표로 채운다.
+    """
+    ids = np.concatenate([t["node_ids"] for t in tiles] + [t["foreign_ids"] for t in tiles])
+    xs = np.concatenate([t["x"] for t in tiles] + [t["foreign_x"] for t in tiles])
+    ys = np.concatenate([t["y"] for t in tiles] + [t["foreign_y"] for t in tiles])
+    node_ids, first = np.unique(ids, return_index=True)
+
+    edge_u = np.concatenate([t["edge_u"] for t in tiles])
+    edge_v = np.concatenate([t["edge_v"] for t in tiles])
+
+    return {
+        "node_ids": node_ids,
+        "x": xs[first],
+        "y": ys[first],
+        "edge_u": np.searchsorted(node_ids, edge_u).astype(np.int32),
+        "edge_v": np.searchsorted(node_ids, edge_v).astype(np.int32),
+        "edge_length": np.concatenate([t["edge_length"] for t in tiles]),
+    }
+
+
+def save_tiles(tiles, network_type):
+    """타일을 각각 디스크에 저장하고 LRU에 올림"""
+    os.makedirs(os.path.join(TILE_DIR, network_type), exist_ok=True)
+    for key, tile in tiles.items():
+        np.savez_compressed(_tile_path(key, network_type), **tile)
+        tile_lru.put((network_type, key), tile, _tile_bytes(tile))
+
+
+def load_tile(key, network_type):
+    """저장된 타일 (메모리 LRU 우선), 없으면 None"""
+    tile = tile_lru.get((network_type, key))
+    if tile is None:
+        path = _tile_path(key, network_type)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            tile = {name: data[name] for name in data.files}
+        tile_lru.put((network_type, key), tile, _tile_bytes(tile))
+    return tile
+
+
+def fetch_tiles(keys, network_type):
+    """
+    빠진 타일들을 감싸는 영역을 한 번에 내려받아 타일로 나눠 저장
+
+    타일 경계에서 엣지가 잘리지 않도록 truncate_by_edge, 다운로드 범위마다 결과가 달라지지 않도록 simplify=False
+    """
+    import osmnx as ox
+
+    from user.graph_cache import graph_to_arrays
+
+    bboxes = [tile_bbox(key) for key in keys]
+    south = min(b[0] for b in bboxes)
+    west = min(b[1] for b in bboxes)
+    north = max(b[2] for b in bboxes)
+    east = max(b[3] for b in bboxes)
+
+    G = ox.graph_from_bbox(
+        (west, south, east, north),
+        network_type=network_type,
+        simplify=False,
+        retain_all=True,
+        truncate_by_edge=True,
+    )
+    tiles = split_tiles(graph_to_arrays(G), set(keys))
+    save_tiles(tiles, network_type)
+    return tiles
+
+
+def get_corridor_graph(points, width=CORRIDOR_WIDTH_M, network_type="walk"):
+    """
+    구간에 걸친 타일만 이어 붙인 보행자 그래프
+
+    Args:
+        points: [(lat, lon), ...] 첫 번째가 출발지, 나머지는 도착지 후보
+        width: 구간 양옆 폭 (미터)
+        network_type: osmnx network_type
+
+    Returns:
+        tuple: (graph_id, networkx.MultiDiGraph, 캐시 사용 여부 (내려받은 타일이 없으면 True))
+    """
+    keys = corridor_tiles(points, width)
+    graph_id = hashlib.sha1(json.dumps([network_type, keys]).encode("utf-8")).hexdigest()[:16]
+
+    G = graph_lru.get(graph_id)
+    if G is not None:
+        return graph_id, G, True
+
+    tiles = {key: load_tile(key, network_type) for key in keys}
+    missing = [key for key, tile in tiles.items() if tile is None]
+    if missing:
+        tiles.update(fetch_tiles(missing, network_type))
+
+    arrays = stitch_tiles([tiles[key] for key in keys])
+    if not len(arrays["node_ids"]):
+        raise ValueError("구간 안에 보행 가능한 도로가 없습니다.")
+
+    G = arrays_to_graph(arrays)
+    graph_lru.put(graph_id, G, estimate_graph_bytes(G))
+    return graph_id, G, not missing
+
+
+def main():
+    from user.overpass_graph import build_walk_arrays, overpass_files
+
+    parser = argparse.ArgumentParser(description="보행자 그래프 타일 저장소 채우기")
+    parser.add_argument("--from-overpass", action="store_true", help="cache/*.json Overpass 데이터로 타일 생성")
+    parser.add_argument("--network-type", default="walk")
+    args = parser.parse_args()
+
+    if not args.from_overpass:
+        parser.error("현재는 --from-overpass만 지원합니다 (나머지 타일은 경로 질의 시 내려받음)")
+
+    arrays = build_walk_arrays(overpass_files(), retain_all=True)
+    bbox = (float(arrays["y"].min()), float(arrays["x"].min()), float(arrays["y"].max()), float(arrays["x"].max()))
+
+    # 데이터 범위 안에 완전히 들어가는 타일만 저장 (경계 타일은 일부 도로가 빠져 있을 수 있음)
+    ix0, iy0 = tile_key(bbox[0], bbox[1])
+    ix1, iy1 = tile_key(bbox[2], bbox[3])
+    keys = {
+        (ix, iy)
+        for ix in range(ix0, ix1 + 1)
+        for iy in range(iy0, iy1 + 1)
+        if bbox_covers(bbox, tile_bbox((ix, iy)))
+    }
+
+    tiles = split_tiles(arrays, keys)
+    save_tiles(tiles, args.network_type)
+    print(f"타일 {len(tiles)}개 저장 ({os.path.join(TILE_DIR, args.network_type)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# user/http_client.py
+
+import contextvars
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 동시에 진행할 수 있는 최대 요청 수 (모든 세션 공통)
+MAX_CONCURRENCY = 8
+
+# 재시도 설정
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5   # 초
+BACKOFF_MAX = 8.0    # 초
+
+# 호스트별 커넥션 풀을 유지하는 공용 세션 (keep-alive)
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=MAX_CONCURRENCY)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+_semaphore = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+# start_call_tracking() 이후의 호출 수 (스레드풀 작업은 copy_context()로 전달)
+_call_counter = contextvars.ContextVar("call_counter", default=None)
+
+
+def _endpoint(url):
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def _record(endpoint, elapsed_ms, error=False, retry=False):
+    counter = _call_counter.get()
+    with _stats_lock:
+        if counter is not None:
+            counter["count"] += 1
+        stat = _stats.setdefault(endpoint, {
+            "count": 0,
+            "errors": 0,
+            "retries": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+        })
+        stat["count"] += 1
+        stat["total_ms"] += elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+        if error:
+            stat["errors"] += 1
+        if retry:
+            stat["retries"] += 1
+
+
+def _backoff(attempt):
+    # 지수 백오프 + full jitter
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    time.sleep(random.uniform(0, delay))
+
+
+def get(url, params=None, headers=None, timeout=10, retries=MAX_RETRIES):
+    """
+    공용 세션으로 GET 요청 (5xx / 타임아웃 / 연결 오류 시 재시도)
+
+    Args:
+        url: 요청 URL
+        params: 쿼리 파라미터
+        headers: 요청 헤더
+        timeout: 요청 타임아웃 (초)
+        retries: 최대 재시도 횟수
+
+    Returns:
+        requests.Response: 마지막 응답 (상태 코드 검사는 호출자가 수행)
+    """
+    endpoint = _endpoint(url)
+
+    for attempt in range(retries + 1):
+        is_last = attempt == retries
+        start = time.perf_counter()
+        try:
+            with _semaphore:
+                response = _session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            _record(endpoint, (time.perf_counter() - start) * 1000, error=True, retry=not is_last)
+            if is_last:
+                raise
+            _backoff(attempt)
+            continue
+
+        failed = response.status_code >= 500
+        _record(endpoint, (time.perf_counter() - start) * 1000, error=failed, retry=failed and not is_last)
+        if failed and not is_last:
+            _backoff(attempt)
+            continue
+
+        return response
+
+
+def get_stats():
+    """
+    엔드포인트별 호출 통계
+
+    Returns:
+        dict: {endpoint: {"count", "errors", "retries", "total_ms", "max_ms", "avg_ms"}}
+    """
+    with _stats_lock:
+        return {
+            endpoint: dict(stat, avg_ms=stat["total_ms"] / stat["count"] if stat["count"] else 0.0)
+            for endpoint, stat in _stats.items()
+        }
+
+
+def start_call_tracking():
+    """
+    현재 스레드(컨텍스트)의 업스트림 호출 수 집계 시작 (재시도 포함)
+
+    Streamlit 실행 시작 시 호출하면 해당 실행 동안의 호출 수가 반환된 dict에 누적됨
+
+    Returns:
+        dict: {"count": int}
+    """
+    counter = {"count": 0}
+    _call_counter.set(counter)
+    return counter
+
+
+def submit(executor, fn, *args, **kwargs):
+    """현재 호출 집계 범위를 유지한 채로 executor에 작업 제출"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,268 @@
+# user/landmarks.py
+#
+# ALT (A*, Landmarks, Triangle inequality) 랜드마크 전처리
+#
+# 전처리: python -m user.landmarks [graph_id ...] [--k 16] [--method farthest|avoid]
+#   → cache/graphs/<graph_id>.alt.npz (랜드마크별 정방향/역방향 거리표, float32)
+# 탐색: user.pathfinding.alt_path (삼각 부등식 하한을 휴리스틱으로 쓰는 A*)
+
+import argparse
+import heapq
+import math
+import os
+import random
+import time
+
+import numpy as np
+
+DEFAULT_LANDMARKS = 16
+
+
+class LandmarkTable:
+    """
+    랜드마크 거리표
+
+    from_landmark[i, v] = d(L_i, v), to_landmark[i, v] = d(v, L_i)  (도달 불가면 inf)
+    노드 인덱스 v는 전처리한 그래프의 node_ids 순서
+    """
+
+    def __init__(self, node_ids, landmarks, from_landmark, to_landmark):
+        self.node_ids = node_ids            # int64 (n) 전처리한 그래프의 OSM 노드 ID (이전 형식 파일은 None)
+        self.landmarks = landmarks          # int32 (k) 노드 인덱스
+        self.from_landmark = from_landmark  # float32 (k, n)
+        self.to_landmark = to_landmark      # float32 (k, n)
+
+    @property
+    def nbytes(self):
+        node_bytes = self.node_ids.nbytes if self.node_ids is not None else 0
+        return node_bytes + self.landmarks.nbytes + self.from_landmark.nbytes + self.to_landmark.nbytes
+
+    def matches(self, csr):
+        """csr와 노드 구성이 같은 그래프에서 전처리한 거리표인지"""
+        return self.node_ids is not None and np.array_equal(self.node_ids, csr.node_ids)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, node_ids=self.node_ids, landmarks=self.landmarks,
+            from_landmark=self.from_landmark, to_landmark=self.to_landmark,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            node_ids = data["node_ids"] if "node_ids" in data.files else None
+            return cls(node_ids, data["landmarks"], data["from_landmark"], data["to_landmark"])
+
+    def lower_bounds(self, t):
+        """
+        모든 노드 v에서 t까지의 하한 거리 (노드 인덱스 순서 NumPy 배열)
+
+        float32 반올림 때문에 실제 거리보다 수 mm 클 수 있음
+        """
+        with np.errstate(invalid="ignore"):
+            forward = self.from_landmark[:, t][:, None] - self.from_landmark
+            backward = self.to_landmark - self.to_landmark[:, t][:, None]
+        # inf - inf (두 노드 모두 도달 불가)는 정보가 없으므로 무시
+        bound = np.fmax(forward, backward).max(axis=0)
+        return np.nan_to_num(np.maximum(bound, 0), nan=0.0, posinf=math.inf)
+
+
+def _shortest_distances(lists, n, s):
+    """s에서 모든 노드까지 Dijkstra (거리, 선행 노드, 확정 순서)"""
+    offsets, targets, weights = lists
+    dist = [math.inf] * n
+    pred = [-1] * n
+    settled = bytearray(n)
+    order = []
+
+    dist[s] = 0
+    open_set = [(0, s)]
+    while open_set:
+        g, current = heapq.heappop(open_set)
+        if settled[current]:
+            continue
+        settled[current] = 1
+        order.append(current)
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[e]
+            new_g = g + weights[e]
+            if new_g < dist[neighbor]:
+                dist[neighbor] = new_g
+                pred[neighbor] = current
+                heapq.heappush(open_set, (new_g, neighbor))
+
+    return dist, pred, order
+
+
+def _select_farthest(csr, k, rng):
+    """이미 고른 랜드마크들로부터 가장 먼 노드를 차례로 선택"""
+    n = csr.num_nodes
+    lists = csr.lists()
+
+    # 임의 노드에서 가장 먼 노드가 첫 랜드마크
+    dist, _, _ = _shortest_distances(lists, n, rng.randrange(n))
+    nearest = np.full(n, np.inf)
+    candidate = np.where(np.isfinite(dist), dist, -1.0)
+
+    landmarks = []
+    while len(landmarks) < k:
+        landmark = int(np.argmax(candidate))
+        if landmark in landmarks:
+            break
+        landmarks.append(landmark)
+
+        dist = np.array(_shortest_distances(lists, n, landmark)[0])
+        nearest = np.minimum(nearest, dist)
+        candidate = np.where(np.isfinite(nearest), nearest, -1.0)
+
+    return landmarks
+
+
+def _select_avoid(csr, k, rng):
+    """
+    avoid 방식 (Goldberg & Werneck)
+
+    임의 루트의 최단 경로 트리에서 현재 하한이 약한(d - 하한이 큰) 노드가 많은 가지를 따라 내려가
+    그 끝 노드를 랜드마크로 선택
+    """
+    n = csr.num_nodes
+    lists = csr.lists()
+    reverse_lists = csr.reverse().lists()
+
+    landmarks = []
+    from_rows, to_rows = [], []
+
+    while len(landmarks) < k:
+        root = rng.randrange(n)
+        dist, pred, order = _shortest_distances(lists, n, root)
+
+        # 현재 랜드마크로 얻는 root → v 하한
+        if landmarks:
+            from_table = np.array(from_rows)
+            to_table = np.array(to_rows)
+            with np.errstate(invalid="ignore"):
+                bound = np.fmax(
+                    from_table - from_table[:, root][:, None],
+                    to_table[:, root][:, None] - to_table,
+                ).max(axis=0)
+            bound = np.nan_to_num(np.maximum(bound, 0), nan=0.0, posinf=0.0).tolist()
+        else:
+            bound = [0.0] * n
+
+        is_landmark = bytearray(n)
+        for landmark in landmarks:
+            is_landmark[landmark] = 1
+
+        # 확정 역순(자식 → 부모)으로 가지 크기 누적, 랜드마크가 있는 가지는 0
+        size = [0.0] * n
+        covered = bytearray(n)
+        children = [[] for _ in range(n)]
+        for v in reversed(order):
+            if is_landmark[v]:
+                covered[v] = 1
+            if not covered[v]:
+                size[v] += dist[v] - bound[v]
+            parent = pred[v]
+            if parent >= 0:
+                children[parent].append(v)
+                if covered[v]:
+                    covered[parent] = 1
+                else:
+                    size[parent] += size[v]
+
+        current = root
+        while True:
+            best = max((c for c in children[current] if not covered[c]), key=size.__getitem__, default=None)
+            if best is None:
+                break
+            current = best
+
+        if is_landmark[current]:
+            continue
+
+        landmarks.append(current)
+        from_rows.append(_shortest_distances(lists, n, current)[0])
+        to_rows.append(_shortest_distances(reverse_lists, n, current)[0])
+
+    return landmarks
+
+
+def build_landmarks(csr, k=DEFAULT_LANDMARKS, method="farthest", seed=0):
+    """
+    랜드마크 선택 후 정방향/역방향 거리표 계산
+
+    Args:
+        csr: CSRGraph
+        k: 랜드마크 수
+        method: "farthest" 또는 "avoid"
+        seed: 랜덤 시드 (같은 그래프에서 같은 결과)
+
+    Returns:
+        LandmarkTable
+    """
+    rng = random.Random(seed)
+    k = min(k, csr.num_nodes)
+
+    if method == "avoid":
+        landmarks = _select_avoid(csr, k, rng)
+    else:
+        landmarks = _select_farthest(csr, k, rng)
+
+    n = csr.num_nodes
+    lists = csr.lists()
+    reverse_lists = csr.reverse().lists()
+
+    from_landmark = np.array([_shortest_distances(lists, n, l)[0] for l in landmarks], dtype=np.float32)
+    to_landmark = np.array([_shortest_distances(reverse_lists, n, l)[0] for l in landmarks], dtype=np.float32)
+
+    return LandmarkTable(
+        np.array(csr.node_ids, dtype=np.int64), np.array(landmarks, dtype=np.int32), from_landmark, to_landmark
+    )
+
+
+def landmarks_path(graph_id):
+    from user.graph_cache import GRAPH_CACHE_DIR
+
+    return os.path.join(GRAPH_CACHE_DIR, f"{graph_id}.alt.npz")
+
+
+def load_landmarks(graph_id, csr=None):
+    """
+    저장된 랜드마크 거리표 (메모리 LRU 우선)
+
+    전처리되지 않았거나, csr을 주었는데 노드 구성이 다르면(같은 graph_id로 그래프를 다시 만든 경우) None
+    """
+    from user.graph_cache import graph_lru
+
+    key = f"{graph_id}:alt"
+    landmarks = graph_lru.get(key)
+    if landmarks is None:
+        path = landmarks_path(graph_id)
+        if not os.path.exists(path):
+            return None
+        landmarks = LandmarkTable.load(path)
+        graph_lru.put(key, landmarks, landmarks.nbytes)
+    if csr is not None and not landmarks.matches(csr):
+        return None
+    return landmarks
+
+
+def main():
+    from user.graph_cache import get_csr, load_index
+
+    parser = argparse.ArgumentParser(description="캐시된 보행자 그래프의 ALT 랜드마크 전처리")
+    parser.add_argument("graph_ids", nargs="*", help="전처리할 graph_id (없으면 전체)")
+    parser.add_argument("--k", type=int, default=DEFAULT_LANDMARKS, help="랜드마크 수")
+    parser.add_argument("--method", choices=("farthest", "avoid"), default="farthest")
+    args = parser.parse_args()
+
+    for graph_id in args.graph_ids or list(load_index()):
+        csr = get_csr(graph_id)
+        start = time.time()
+        landmarks = build_landmarks(csr, args.k, args.method)
+        landmarks.save(landmarks_path(graph_id))
+        print(f"{graph_id}: 랜드마크 {len(landmarks.landmarks)}개 ({args.method}), {time.time() - start:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# user/library_directory.py
+#
+# 전국 도서관 목록(정보나루 libSrch) 로컬 저장소 + 격자 공간 인덱스
+#
+# 갱신: python -m user.library_directory            (NARU_API_KEY 필요, cron 등으로 주기 실행)
+#       앱에서는 목록이 오래되면 백그라운드에서 한 번 갱신
+# 조회: 사용자 주변 반경 안의 도서관을 지역 코드와 무관하게 찾는다.
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from user.map import calculate_distances, library_coordinates
+
+DEFAULT_DIRECTORY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "cache",
+    "library_directory.sqlite3",
+)
+
+LIB_SRCH_URL = "http://data4library.kr/api/libSrch"
+
+# libSrch 한 페이지 크기
+LIB_SRCH_PAGE_SIZE = 500
+
+# 백그라운드 갱신이 실패한 뒤 다시 시도하기까지 기다리는 시간 (초)
+REFRESH_RETRY_INTERVAL = 60 * 60
+
+# 격자 한 변 (도), 0.01도 ≈ 1km
+GRID_SIZE_DEG = 0.01
+
+# 1도당 거리 (미터, 위도 방향)
+METERS_PER_DEGREE = 111320.0
+
+COLUMNS = ("libCode", "libName", "address", "tel", "latitude", "longitude", "homepage", "closed", "operatingTime")
+
+
+class _GridIndex:
+    """도서관 좌표 격자 인덱스 (생성 후 변경하지 않음)"""
+
+    def __init__(self, libraries):
+        self.libraries = libraries
+        self.lats, self.lons = library_coordinates(libraries)
+
+        valid = np.flatnonzero(~np.isnan(self.lats) & (self.lats != 0) & (self.lons != 0))
+        ix = np.floor(self.lons[valid] / GRID_SIZE_DEG).astype(np.int64)
+        iy = np.floor(self.lats[valid] / GRID_SIZE_DEG).astype(np.int64)
+
+        self.cells = {}
+        for cell, i in zip(zip(ix.tolist(), iy.tolist()), valid.tolist()):
+            self.cells.setdefault(cell, []).append(i)
+
+    def within(self, lat, lon, radius):
+        delta_lat = radius / METERS_PER_DEGREE
+        delta_lon = radius / (METERS_PER_DEGREE * max(np.cos(np.radians(lat)), 1e-6))
+        ix0, ix1 = int(np.floor((lon - delta_lon) / GRID_SIZE_DEG)), int(np.floor((lon + delta_lon) / GRID_SIZE_DEG))
+        iy0, iy1 = int(np.floor((lat - delta_lat) / GRID_SIZE_DEG)), int(np.floor((lat + delta_lat) / GRID_SIZE_DEG))
+
+        candidates = [
+            i
+            for cx in range(ix0, ix1 + 1)
+            for cy in range(iy0, iy1 + 1)
+            for i in self.cells.get((cx, cy), ())
+        ]
+        if not candidates:
+            return []
+
+        candidates = np.array(candidates)
+        distances = calculate_distances(lat, lon, self.lats[candidates], self.lons[candidates])
+        inside = distances <= radius
+        order = np.argsort(distances[inside], kind="stable")
+        return [self.libraries[i] for i in candidates[inside][order].tolist()]
+
+
+class LibraryDirectory:
+    """
+    전국 도서관 목록 SQLite 저장소
+
+    조회용 격자 인덱스는 메모리에 두고, 갱신하면 새 인덱스로 통째로 교체한다.
+    앱에서는 get_library_directory()로 프로세스당 하나의 인스턴스를 공유한다.
+    """
+
+    def __init__(self, path=DEFAULT_DIRECTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._failed_at = None
+        self._index = None
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS libraries (
+                    lib_code TEXT PRIMARY KEY,
+                    lib_name TEXT,
+                    address TEXT,
+                    tel TEXT,
+                    latitude TEXT,
+                    longitude TEXT,
+                    homepage TEXT,
+                    closed TEXT,
+                    operating_time TEXT
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _load_index(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT lib_code, lib_name, address, tel, latitude, longitude, homepage, closed, operating_time "
+                "FROM libraries ORDER BY lib_code"
+            ).fetchall()
+        return _GridIndex([dict(zip(COLUMNS, row)) for row in rows])
+
+    def _get_index(self):
+        index = self._index
+        if index is None:
+            index = self._load_index()
+            self._index = index
+        return index
+
+    def __len__(self):
+        return len(self._get_index().libraries)
+
+    def refreshed_at(self):
+        """마지막 갱신 시각 (epoch 초), 갱신한 적 없으면 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'refreshed_at'").fetchone()
+        return row[0] if row else None
+
+    def is_stale(self, max_age):
+        refreshed_at = self.refreshed_at()
+        return refreshed_at is None or time.time() - refreshed_at > max_age
+
+    def replace(self, libraries):
+        """도서관 목록 전체 교체 (libSrch lib 형식 dict 목록)"""
+        rows = [tuple(str(library.get(column, "") or "") for column in COLUMNS) for library in libraries if library.get("libCode")]
+
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM libraries")
+            conn.executemany("INSERT OR REPLACE INTO libraries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('refreshed_at', ?)", (time.time(),))
+
+        self._index = self._load_index()
+        return len(rows)
+
+    def refresh(self, fetch):
+        """
+        fetch()로 전체 목록을 받아 교체
+
+        빈 목록이면 기존 목록과 갱신 시각을 그대로 두고 ValueError
+
+        Args:
+            fetch: () -> 도서관 dict 목록
+
+        Returns:
+            int: 저장한 도서관 수
+        """
+        libraries = fetch()
+        if not libraries:
+            raise ValueError("받은 도서관 목록이 비어 있습니다.")
+        return self.replace(libraries)
+
+    def refresh_in_background(self, fetch, max_age, retry_interval=REFRESH_RETRY_INTERVAL):
+        """
+        목록이 오래됐으면 백그라운드 스레드로 한 번만 갱신 (조회는 기존 목록으로 계속)
+
+        실패하면 retry_interval 동안은 다시 시도하지 않음
+        """
+        with self._lock:
+            if self._refreshing or not self.is_stale(max_age):
+                return False
+            if self._failed_at is not None and time.time() - self._failed_at < retry_interval:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(fetch)
+                self._failed_at = None
+            except Exception as e:
+                self._failed_at = time.time()
+                print(f"도서관 목록 갱신 실패: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def within_radius(self, lat, lon, radius):
+        """
+        반경 안의 도서관 (가까운 순)
+
+        Args:
+            lat, lon: 기준 위도, 경도
+            radius: 반경 (미터)
+
+        Returns:
+            list: 도서관 dict 목록 (libCode, libName, address, tel, latitude, longitude, ...)
+        """
+        return self._get_index().within(lat, lon, radius)
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_library_directory(fetch=None, max_age=None):
+    """
+    앱에서 쓰는 공용 LibraryDirectory (Streamlit 재실행·세션 간 같은 인스턴스)
+
+    fetch와 max_age를 주면 목록이 오래됐을 때 백그라운드 갱신을 시작한다 (진행 중이거나 최근에 실패했으면 건너뜀).
+    """
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = LibraryDirectory()
+
+    if fetch is not None and max_age is not None:
+        _directory.refresh_in_background(fetch, max_age)
+    return _directory
+
+
+def naru_fetcher(auth_key, page_size=LIB_SRCH_PAGE_SIZE):
+    """
+    정보나루 libSrch 전체 페이지를 받아 도서관 목록으로 반환하는 조회 함수
+
+    오류 응답(HTTP 200이라도 response.error)이거나 numFound보다 적게 받으면 ValueError
+    """
+    from user import http_client
+
+    def fetch():
+        libraries = []
+        found = 0
+        page_no = 1
+        while True:
+            response = http_client.get(
+                LIB_SRCH_URL,
+                params={"authKey": auth_key, "format": "json", "pageNo": page_no, "pageSize": page_size},
+                timeout=30,
+            )
+            response.raise_for_status()
+            data = response.json().get("response", {})
+            if data.get("error"):
+                raise ValueError(f"libSrch 오류 응답: {data['error']}")
+
+            found = int(data.get("numFound", 0))
+            libs = [item.get("lib", {}) for item in data.get("libs", [])]
+            libraries.extend(libs)
+            if not libs or len(libraries) >= found:
+                break
+            page_no += 1
+
+        if not found or len(libraries) < found:
+            raise ValueError(f"libSrch 목록이 불완전합니다 ({len(libraries)}/{found})")
+        return libraries
+
+    return fetch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정보나루 전국 도서관 목록 갱신")
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY_PATH, help="저장소 경로")
+    args = parser.parse_args()
+
+    from config import NARU_API_KEY
+
+    count = LibraryDirectory(args.directory).refresh(naru_fetcher(NARU_API_KEY))
+    print(f"도서관 {count}곳 저장 완료")
+
+
+if __name__ == "__main__":
+    main()
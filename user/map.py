@@ -1,8 +1,9 @@
 # user/a_star.py
 
-import heapq
 import math
 
+import numpy as np
+
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
@@ -28,13 +29,61 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     return R * c
 
 
-def astar_find_nearest_library(user_location, libraries):
+def calculate_distances(lat, lon, lats, lons):
+    """
+    한 지점에서 여러 좌표까지의 거리를 한 번에 계산 (벡터화 Haversine)
+
+    Args:
+        lat, lon: 기준점 위도, 경도
+        lats, lons: 대상 위도, 경도 배열
+
+    Returns:
+        np.ndarray: 거리 (미터, float64)
+    """
+    R = 6371000  # 지구 반지름 (미터) - calculate_distance와 동일
+
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(lons) - math.radians(lon)
+
+    a = np.sin(delta_phi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def library_coordinates(libraries):
+    """
+    도서관 좌표를 NumPy 배열로 한 번에 변환
+
+    Returns:
+        tuple: (위도 배열, 경도 배열) - 좌표가 잘못된 도서관은 NaN
+    """
+    lats = np.full(len(libraries), np.nan)
+    lons = np.full(len(libraries), np.nan)
+
+    for i, library in enumerate(libraries):
+        try:
+            lat = float(library.get('latitude', 0))
+            lon = float(library.get('longitude', 0))
+        except (ValueError, TypeError):
+            # 좌표 정보가 잘못된 도서관은 스킵
+            continue
+        lats[i] = lat
+        lons[i] = lon
+
+    return lats, lons
+
+
+def astar_find_nearest_library(user_location, libraries, k=None):
     """
     A* 알고리즘으로 가장 가까운 도서관 찾기
 
+    모든 도서관까지의 직선 거리를 한 번에 계산하고 가까운 k곳만 골라 결과를 만든다.
+
     Args:
         user_location: dict {'latitude': float, 'longitude': float}
         libraries: list of dict [{'libName': str, 'latitude': float, 'longitude': float, ...}]
+        k: 반환할 도서관 수 (None이면 전체)
 
     Returns:
         list: 거리순으로 정렬된 도서관 리스트 (거리 정보 포함)
@@ -42,37 +91,73 @@ def astar_find_nearest_library(user_location, libraries):
     user_lat = user_location['latitude']
     user_lon = user_location['longitude']
 
-    results = []
+    # 직선 거리 계산 (A*의 휴리스틱)
+    lats, lons = library_coordinates(libraries)
+    distances = calculate_distances(user_lat, user_lon, lats, lons)
 
-    for library in libraries:
-        try:
-            lib_lat = float(library.get('latitude', 0))
-            lib_lon = float(library.get('longitude', 0))
+    valid = np.flatnonzero(~np.isnan(distances))
 
-            # 직선 거리 계산 (A*의 휴리스틱)
-            distance = calculate_distance(user_lat, user_lon, lib_lat, lib_lon)
+    # 가까운 k곳만 선택 (전체 정렬 없이)
+    if k is not None and k < len(valid):
+        valid = valid[np.argpartition(distances[valid], max(k - 1, 0))[:k]]
 
-            # 보행 시간 계산 (평균 보행 속도: 4.5 km/h = 1.25 m/s)
-            walking_time = distance / 1.25  # 초
-            walking_time_minutes = walking_time / 60  # 분
-
-            results.append({
-                'library': library,
-                'distance_m': round(distance, 1),
-                'distance_km': round(distance / 1000, 2),
-                'walking_time_min': round(walking_time_minutes, 1),
-                'walking_time_str': format_time(walking_time_minutes)
-            })
-        except (ValueError, KeyError) as e:
-            # 좌표 정보가 없거나 잘못된 도서관은 스킵
-            continue
+    # 거리순 정렬 (A* 결과), 같은 거리는 원래 순서 유지
+    order = valid[np.lexsort((valid, np.round(distances[valid], 1)))]
+
+    results = []
+
+    for i in order.tolist():
+        distance = float(distances[i])
+
+        # 보행 시간 계산 (평균 보행 속도: 4.5 km/h = 1.25 m/s)
+        walking_time = distance / 1.25  # 초
+        walking_time_minutes = walking_time / 60  # 분
 
-    # 거리순 정렬 (A* 결과)
-    results.sort(key=lambda x: x['distance_m'])
+        results.append({
+            'library': libraries[i],
+            'distance_m': round(distance, 1),
+            'distance_km': round(distance / 1000, 2),
+            'walking_time_min': round(walking_time_minutes, 1),
+            'walking_time_str': format_time(walking_time_minutes)
+        })
 
     return results
 
 
+def rank_libraries_by_walking(library_results, walking_distances):
+    """
+    실제 보행 거리 기준으로 도서관 재정렬
+
+    Args:
+        library_results: astar_find_nearest_library 결과 리스트
+        walking_distances: 같은 순서의 도로망 보행 거리 (미터, 도달 불가면 None)
+
+    Returns:
+        list: 보행 거리순으로 정렬된 결과 (도달 불가 도서관은 직선 거리순으로 뒤에 배치)
+              각 항목에 'walking_distance_m' 추가, 도달 가능하면 보행 시간도 실제 거리 기준으로 갱신
+    """
+    ranked = []
+
+    for result, walking_distance in zip(library_results, walking_distances):
+        result = dict(result)
+        if walking_distance is None:
+            result['walking_distance_m'] = None
+        else:
+            # 보행 시간 계산 (평균 보행 속도: 4.5 km/h = 1.25 m/s)
+            walking_time_minutes = walking_distance / 1.25 / 60
+            result['walking_distance_m'] = round(walking_distance, 1)
+            result['walking_time_min'] = round(walking_time_minutes, 1)
+            result['walking_time_str'] = format_time(walking_time_minutes)
+        ranked.append(result)
+
+    ranked.sort(key=lambda x: (
+        x['walking_distance_m'] is None,
+        x['walking_distance_m'] if x['walking_distance_m'] is not None else x['distance_m'],
+    ))
+
+    return ranked
+
+
 def format_time(minutes):
     """
     분을 읽기 좋은 형식으로 변환
@@ -0,0 +1,136 @@
+# user/node_index.py
+#
+# 그래프별 최근접 노드 인덱스
+#
+# 노드 좌표를 그래프 중심 기준 평면 좌표(미터, equirectangular)로 바꿔
+# scipy가 있으면 cKDTree, 없으면 NumPy 전수 비교로 찾는다.
+# 평면 좌표는 cache/graphs/<graph_id>.nodes.npz에 저장하고 인덱스는 메모리 LRU에서 공유한다.
+
+import os
+
+import numpy as np
+
+from user.graph_cache import GRAPH_CACHE_DIR, METERS_PER_DEGREE, graph_lru, load_index
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy 없이도 동작 (전수 비교, 노드 수에 비례해 느림)
+    cKDTree = None
+
+_fallback_logged = False
+
+# 전수 비교 시 한 번에 만드는 (질의 수 × 노드 수) 거리 행렬의 최대 원소 수
+BRUTE_FORCE_BLOCK = 1_000_000
+
+
+def _project(origin, lats, lons):
+    """위경도 → 기준점 중심 평면 좌표 (미터)"""
+    lat0, lon0 = origin
+    meters_per_lon = METERS_PER_DEGREE * np.cos(np.radians(lat0))
+    return np.column_stack([
+        (np.asarray(lons, dtype=np.float64) - lon0) * meters_per_lon,
+        (np.asarray(lats, dtype=np.float64) - lat0) * METERS_PER_DEGREE,
+    ])
+
+
+def _log_fallback():
+    global _fallback_logged
+    if not _fallback_logged:
+        _fallback_logged = True
+        print("scipy가 없어 최근접 노드를 NumPy 전수 비교로 찾습니다 (pip install scipy 로 KD-tree 사용).")
+
+
+class NodeIndex:
+    """좌표 → 가장 가까운 노드 (한 번에 여러 좌표 질의 가능)"""
+
+    def __init__(self, node_ids, origin, xy):
+        self.node_ids = node_ids  # int64 (n)
+        self.origin = origin      # float64 (2) 기준 위도, 경도
+        self.xy = xy              # float64 (n, 2) 평면 좌표 (미터)
+        self.tree = cKDTree(xy) if cKDTree is not None else None
+        if self.tree is None:
+            _log_fallback()
+
+    @classmethod
+    def from_coords(cls, node_ids, x, y):
+        """노드 경도(x), 위도(y) 배열로 생성 (기준점은 좌표 범위의 중심)"""
+        origin = np.array([(y.min() + y.max()) / 2, (x.min() + x.max()) / 2])
+        return cls(np.asarray(node_ids, dtype=np.int64), origin, _project(origin, y, x))
+
+    @property
+    def nbytes(self):
+        # cKDTree는 좌표 사본과 트리 노드를 가지므로 좌표 크기의 약 3배로 추정
+        return self.node_ids.nbytes + self.xy.nbytes * (3 if self.tree is not None else 1)
+
+    def nearest(self, lats, lons):
+        """
+        가장 가까운 노드
+
+        Args:
+            lats, lons: 위도, 경도 (스칼라 또는 같은 길이의 배열)
+
+        Returns:
+            tuple: (OSM 노드 ID, 평면 거리(미터)) - 스칼라 입력이면 스칼라, 배열이면 배열
+        """
+        scalar = np.ndim(lats) == 0
+        points = _project(self.origin, np.atleast_1d(lats), np.atleast_1d(lons))
+
+        if self.tree is not None:
+            dist, idx = self.tree.query(points)
+        else:
+            idx = np.empty(len(points), dtype=np.int64)
+            dist = np.empty(len(points))
+            step = max(1, BRUTE_FORCE_BLOCK // max(len(self.xy), 1))
+            for start in range(0, len(points), step):
+                block = points[start:start + step]
+                d2 = ((block[:, None, :] - self.xy[None, :, :]) ** 2).sum(axis=2)
+                best = d2.argmin(axis=1)
+                idx[start:start + step] = best
+                dist[start:start + step] = np.sqrt(d2[np.arange(len(block)), best])
+
+        node_ids = self.node_ids[idx]
+        if scalar:
+            return int(node_ids[0]), float(dist[0])
+        return node_ids, dist
+
+    def save(self, path):
+        np.savez_compressed(path, node_ids=self.node_ids, origin=self.origin, xy=self.xy)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["node_ids"], data["origin"], data["xy"])
+
+
+def _index_path(graph_id):
+    return os.path.join(GRAPH_CACHE_DIR, f"{graph_id}.nodes.npz")
+
+
+def get_node_index(graph_id, csr):
+    """
+    그래프의 최근접 노드 인덱스 (메모리 LRU → 디스크 → 생성)
+
+    디스크에 저장된 그래프(index.json에 등록된 graph_id)만 인덱스를 함께 저장한다.
+    저장된 인덱스의 노드가 csr과 다르면(같은 graph_id로 그래프를 다시 만든 경우) 새로 만들어 덮어쓴다.
+
+    Args:
+        graph_id: 그래프 ID
+        csr: 같은 그래프의 CSRGraph (노드 좌표 출처)
+
+    Returns:
+        NodeIndex
+    """
+    key = f"{graph_id}:nodes"
+    index = graph_lru.get(key)
+    if index is not None and np.array_equal(index.node_ids, csr.node_ids):
+        return index
+
+    path = _index_path(graph_id)
+    index = NodeIndex.load(path) if os.path.exists(path) else None
+    if index is None or not np.array_equal(index.node_ids, csr.node_ids):
+        index = NodeIndex.from_coords(csr.node_ids, csr.x, csr.y)
+        if graph_id in load_index():
+            index.save(path)
+
+    graph_lru.put(key, index, index.nbytes)
+    return index
@@ -0,0 +1,276 @@
+# user/overpass_graph.py
+#
+# cache/*.json (osmnx가 저장한 Overpass 응답)에서 보행자 그래프를 직접 생성
+#
+# 문서 전체를 json.load 하지 않고 "elements" 배열을 요소 단위로 스트리밍 파싱한다.
+# 네트워크 없이 항상 같은 그래프를 만들므로 오프라인 경로 탐색과 테스트 데이터로 쓸 수 있다.
+#
+# 사용: python -m user.overpass_graph [파일 ...]   (인자가 없으면 cache/*.json 전체)
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+OVERPASS_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "cache",
+)
+
+# graph_cache 인덱스에서 다운로드 그래프와 구분하기 위한 network_type
+OFFLINE_NETWORK_TYPE = "walk_offline"
+
+# 한 번에 읽을 문자 수
+CHUNK_SIZE = 64 * 1024
+
+# osmnx와 같은 지구 반지름 (엣지 길이를 osmnx 그래프와 맞춤)
+EARTH_RADIUS_M = 6371009
+
+# osmnx "walk" 필터와 같은 제외 조건: 태그 → 정규식 (Overpass의 ["tag"!~"..."]처럼 부분 일치)
+# 예: "motor"는 motorway, motorway_link, motorroad도 제외
+WALK_EXCLUDE = {
+    "highway": re.compile(
+        "abandoned|bus_guideway|construction|cycleway|motor|no|planned|platform|proposed|raceway|razed"
+    ),
+    "area": re.compile("yes"),
+    "access": re.compile("private"),
+    "foot": re.compile("no"),
+    "service": re.compile("private"),
+}
+
+# 숫자가 이어질 수 있는 문자 (올바른 JSON에서 값 바로 뒤에는 올 수 없음)
+_NUMBER_CHARS = set("0123456789.eE+-")
+
+
+class _Reader:
+    """파일을 CHUNK_SIZE씩 읽으며 JSON 값을 하나씩 디코딩"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self):
+        """공백을 건너뛴 다음 문자 (파일 끝이면 빈 문자열)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Overpass JSON 형식 오류: '{char}' 필요 (위치 {self.pos})")
+        self.pos += 1
+
+    def value(self):
+        """다음 JSON 값 (버퍼 끝에서 잘린 값이면 더 읽고 다시 시도)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 버퍼 끝에서 잘린 숫자("0." → 0)는 오류 없이 디코딩되므로 뒤 문자를 확인
+            if not self.eof and (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_elements(path, chunk_size=CHUNK_SIZE):
+    """
+    Overpass JSON의 elements 배열을 요소(dict) 단위로 반환
+
+    최상위 객체의 다른 키(version, osm3s 등)는 디코딩 후 버리고, elements를 다 읽으면 종료
+    """
+    with open(path, encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect("{")
+
+        while reader.peek() not in ("}", ""):
+            key = reader.value()
+            reader.expect(":")
+
+            if key == "elements":
+                reader.expect("[")
+                while reader.peek() != "]":
+                    yield reader.value()
+                    if reader.peek() == ",":
+                        reader.expect(",")
+                return
+
+            reader.value()
+            if reader.peek() == ",":
+                reader.expect(",")
+
+
+def is_walkable(tags):
+    """osmnx "walk" 네트워크 기준으로 걸을 수 있는 길인지 (highway 태그 필수, 없는 태그는 통과)"""
+    if "highway" not in tags:
+        return False
+    return not any(
+        pattern.search(str(tags[tag]))
+        for tag, pattern in WALK_EXCLUDE.items()
+        if tag in tags
+    )
+
+
+def _largest_component(n, edge_u, edge_v):
+    """약하게 연결된 가장 큰 구성 요소의 노드 마스크 (union-find)"""
+    parent = list(range(n))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for u, v in zip(edge_u.tolist(), edge_v.tolist()):
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+
+    roots = np.array([find(i) for i in range(n)])
+    return roots == np.bincount(roots).argmax()
+
+
+def build_walk_arrays(paths, retain_all=False):
+    """
+    Overpass JSON 파일들 → 보행자 그래프 배열 (graph_cache.graph_to_arrays와 같은 형식)
+
+    - 보행자는 일방통행과 무관하게 양방향 (oneway:foot 태그만 적용)
+    - 엣지 길이는 노드 간 대원 거리
+    - 여러 파일의 노드/웨이는 OSM ID로 중복 제거
+
+    Args:
+        paths: Overpass JSON 파일 경로 목록
+        retain_all: False면 가장 큰 연결 요소만 유지 (osmnx 기본값과 동일)
+
+    Returns:
+        dict: node_ids(int64), x/y(float64), edge_u/edge_v(int32), edge_length(float32)
+    """
+    coords = {}
+    ways = {}
+    for path in paths:
+        for element in iter_elements(path):
+            element_type = element.get("type")
+            if element_type == "node":
+                coords[element["id"]] = (element["lon"], element["lat"])
+            elif element_type == "way":
+                tags = element.get("tags", {})
+                if is_walkable(tags):
+                    ways[element["id"]] = (element["nodes"], tags.get("oneway:foot"))
+
+    pairs = []
+    for way_id in sorted(ways):
+        nodes, oneway = ways[way_id]
+        forward = oneway != "-1"
+        backward = oneway not in ("yes", "true", "1")
+        for a, b in zip(nodes, nodes[1:]):
+            if a == b or a not in coords or b not in coords:
+                continue
+            if forward:
+                pairs.append((a, b))
+            if backward:
+                pairs.append((b, a))
+
+    if not pairs:
+        raise ValueError("Overpass 데이터에 보행 가능한 도로가 없습니다.")
+
+    node_ids = np.array(sorted({node for pair in pairs for node in pair}), dtype=np.int64)
+    index = {node: i for i, node in enumerate(node_ids.tolist())}
+    x = np.array([coords[node][0] for node in node_ids.tolist()], dtype=np.float64)
+    y = np.array([coords[node][1] for node in node_ids.tolist()], dtype=np.float64)
+
+    edge_u = np.array([index[a] for a, _ in pairs], dtype=np.int32)
+    edge_v = np.array([index[b] for _, b in pairs], dtype=np.int32)
+
+    if not retain_all:
+        keep = _largest_component(len(node_ids), edge_u, edge_v)
+        new_index = np.cumsum(keep) - 1
+        edge_keep = keep[edge_u]
+        edge_u = new_index[edge_u[edge_keep]].astype(np.int32)
+        edge_v = new_index[edge_v[edge_keep]].astype(np.int32)
+        node_ids, x, y = node_ids[keep], x[keep], y[keep]
+
+    # 대원 거리 (벡터화 Haversine)
+    lat1, lon1 = np.radians(y[edge_u]), np.radians(x[edge_u])
+    lat2, lon2 = np.radians(y[edge_v]), np.radians(x[edge_v])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    edge_length = (2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).astype(np.float32)
+
+    return {"node_ids": node_ids, "x": x, "y": y, "edge_u": edge_u, "edge_v": edge_v, "edge_length": edge_length}
+
+
+def overpass_files(directory=OVERPASS_CACHE_DIR):
+    return sorted(glob.glob(os.path.join(directory, "*.json")))
+
+
+def offline_graph_id(paths):
+    """파일 이름과 크기로 정해지는 graph_id (같은 데이터면 항상 같은 ID)"""
+    raw = json.dumps([[os.path.basename(path), os.path.getsize(path)] for path in sorted(paths)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def load_offline_graph(paths=None):
+    """
+    로컬 Overpass 데이터로 만든 보행자 그래프 (graph_cache에 저장해 CH/ALT 전처리와 CSR 캐시를 그대로 사용)
+
+    Args:
+        paths: Overpass JSON 파일 목록 (없으면 cache/*.json 전체)
+
+    Returns:
+        tuple: (graph_id, networkx.MultiDiGraph, 캐시 사용 여부)
+    """
+    from user.graph_cache import (
+        arrays_to_graph, estimate_graph_bytes, graph_lru, load_graph, load_index, save_graph,
+    )
+
+    paths = paths or overpass_files()
+    if not paths:
+        raise FileNotFoundError(f"Overpass JSON 파일이 없습니다: {OVERPASS_CACHE_DIR}")
+
+    graph_id = offline_graph_id(paths)
+    if graph_id in load_index():
+        try:
+            return graph_id, load_graph(graph_id), True
+        except FileNotFoundError:
+            pass
+
+    arrays = build_walk_arrays(paths)
+    G = arrays_to_graph(arrays)
+    bbox = (float(arrays["y"].min()), float(arrays["x"].min()), float(arrays["y"].max()), float(arrays["x"].max()))
+    save_graph(G, bbox, OFFLINE_NETWORK_TYPE, graph_id)
+    graph_lru.put(graph_id, G, estimate_graph_bytes(G))
+    return graph_id, G, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 Overpass JSON으로 보행자 그래프 생성")
+    parser.add_argument("paths", nargs="*", help="Overpass JSON 파일 (없으면 cache/*.json 전체)")
+    args = parser.parse_args()
+
+    graph_id, G, cached = load_offline_graph(args.paths or None)
+    source = "기존 그래프" if cached else "새로 생성"
+    print(f"{graph_id}: 노드 {G.number_of_nodes()}, 엣지 {G.number_of_edges()} ({source})")
+
+
+if __name__ == "__main__":
+    main()
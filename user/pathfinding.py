@@ -0,0 +1,318 @@
+# user/pathfinding.py
+#
+# 최단 경로 탐색 (networkx 그래프 또는 CSRGraph)
+# 모든 탐색 함수는 (경로, 거리, 실행시간(초), 탐색 노드 수)를 반환하며
+# 경로를 찾지 못하면 (None, None, None, None)
+#
+# 탐색 커널은 노드 인덱스로 접근하는 배열(거리, 선행 노드, 확정 여부)을 쿼리마다 한 번 할당하고
+# 힙에는 (우선순위, 노드)만 넣는다. 경로는 도착 후 선행 노드 배열을 따라 복원한다.
+
+import heapq
+import math
+import time
+import weakref
+
+import numpy as np
+
+from user.csr_graph import CSRGraph
+from user.map import calculate_distances
+
+# networkx 그래프별 CSR 변환 결과 (그래프가 사라지면 함께 제거)
+_csr_cache = weakref.WeakKeyDictionary()
+
+
+def to_csr(G, weight='length'):
+    """networkx 그래프 → CSRGraph (그래프·가중치별로 한 번만 변환)"""
+    if isinstance(G, CSRGraph):
+        return G
+
+    by_weight = _csr_cache.setdefault(G, {})
+    if weight not in by_weight:
+        by_weight[weight] = CSRGraph.from_networkx(G, weight)
+    return by_weight[weight]
+
+
+# A* 알고리즘 구현
+def astar_path(G, source, target, weight='length'):
+    """A* 알고리즘으로 최단 경로 찾기 (CSRGraph는 생성 시 지정한 가중치 사용)"""
+    csr = to_csr(G, weight)
+    t = csr.index[target]
+
+    start_time = time.time()
+
+    # 모든 노드의 휴리스틱(도착지까지 대원 거리)을 한 번에 계산해 배열 조회로 사용
+    heuristic = heuristic_table(csr, t)
+
+    return _search(csr, csr.index[source], t, heuristic, start_time)
+
+
+def heuristic_table(csr, t):
+    """
+    도착지 t까지의 대원 거리 표 (벡터화 Haversine, 노드 인덱스 순서)
+
+    osmnx 엣지 길이는 더 큰 지구 반지름(6371009m)으로 계산되므로 이 값은 항상 실제 거리 이하 (admissible)
+    """
+    return calculate_distances(float(csr.y[t]), float(csr.x[t]), csr.y, csr.x).tolist()
+
+
+# ALT (랜드마크) A* 구현
+def alt_path(G, source, target, landmarks, weight='length'):
+    """
+    랜드마크 삼각 부등식 하한과 대원 거리 중 큰 값을 휴리스틱으로 쓰는 A*
+
+    Args:
+        landmarks: user.landmarks.LandmarkTable (같은 그래프에서 전처리한 거리표)
+    """
+    csr = to_csr(G, weight)
+    if not landmarks.matches(csr):
+        raise ValueError("랜드마크 거리표가 이 그래프와 맞지 않습니다. python -m user.landmarks 로 다시 전처리하세요.")
+    t = csr.index[target]
+
+    start_time = time.time()
+
+    great_circle = calculate_distances(float(csr.y[t]), float(csr.x[t]), csr.y, csr.x)
+    heuristic = np.maximum(landmarks.lower_bounds(t), great_circle).tolist()
+
+    return _search(csr, csr.index[source], t, heuristic, start_time)
+
+
+# Dijkstra 알고리즘 구현
+def dijkstra_path(G, source, target, weight='length'):
+    """Dijkstra 알고리즘으로 최단 경로 찾기 (CSRGraph는 생성 시 지정한 가중치 사용)"""
+    csr = to_csr(G, weight)
+    return _search(csr, csr.index[source], csr.index[target])
+
+
+# 양방향 A* 알고리즘 구현
+def bidirectional_astar_path(G, source, target, weight='length'):
+    """
+    양방향 A* (평균 포텐셜 방식)
+
+    정방향 포텐셜 p(v) = (h_t(v) - h_s(v)) / 2, 역방향은 -p(v)를 사용하면
+    두 방향의 축소 비용이 일치하므로 양방향 Dijkstra와 같은 종료 조건을 쓸 수 있다.
+    """
+    csr = to_csr(G, weight)
+    csr.reverse()  # 역방향 그래프는 그래프당 한 번만 생성 (측정 시간에서 제외)
+    s, t = csr.index[source], csr.index[target]
+
+    start_time = time.time()
+
+    to_target = calculate_distances(float(csr.y[t]), float(csr.x[t]), csr.y, csr.x)
+    from_source = calculate_distances(float(csr.y[s]), float(csr.x[s]), csr.y, csr.x)
+    potential = ((to_target - from_source) / 2).tolist()
+
+    return _bidirectional_search(csr, s, t, potential, start_time)
+
+
+# 양방향 Dijkstra 알고리즘 구현
+def bidirectional_dijkstra_path(G, source, target, weight='length'):
+    """출발지와 도착지에서 동시에 탐색하는 Dijkstra"""
+    csr = to_csr(G, weight)
+    return _bidirectional_search(csr, csr.index[source], csr.index[target])
+
+
+# 다중 목적지 Dijkstra
+def dijkstra_multi_target(G, source, targets, cutoff=None, weight='length'):
+    """
+    한 번의 Dijkstra로 여러 목적지까지의 최단 거리 계산
+
+    모든 목적지가 확정되거나 탐색 거리가 cutoff를 넘으면 종료
+
+    Args:
+        G: networkx 그래프 또는 CSRGraph
+        source: 출발 노드
+        targets: 목적지 노드 목록 (중복 가능)
+        cutoff: 최대 탐색 거리 (미터), None이면 제한 없음
+
+    Returns:
+        tuple: ({목적지 노드: 거리} (도달한 목적지만), 실행시간(초), 탐색 노드 수)
+    """
+    csr = to_csr(G, weight)
+    offsets, targets_list, weights = csr.lists()
+    n = csr.num_nodes
+    limit = math.inf if cutoff is None else cutoff
+
+    start_time = time.time()
+
+    s = csr.index[source]
+    remaining = {csr.index[node] for node in targets}
+
+    dist = [math.inf] * n
+    settled = bytearray(n)
+    dist[s] = 0
+    open_set = [(0, s)]
+    found = {}
+    nodes_visited = 0
+
+    while open_set and remaining:
+        g, current = heapq.heappop(open_set)
+
+        if settled[current]:
+            continue
+        if g > limit:
+            break
+
+        settled[current] = 1
+        nodes_visited += 1
+
+        if current in remaining:
+            remaining.discard(current)
+            found[int(csr.node_ids[current])] = g
+
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets_list[e]
+            new_g = g + weights[e]
+            if new_g < dist[neighbor]:
+                dist[neighbor] = new_g
+                heapq.heappush(open_set, (new_g, neighbor))
+
+    return found, time.time() - start_time, nodes_visited
+
+
+def _reconstruct(pred, s, t):
+    path = [t]
+    while path[-1] != s:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+
+def _search(csr, s, t, heuristic=None, start_time=None):
+    """
+    단방향 탐색 커널 (heuristic이 없으면 Dijkstra)
+
+    Args:
+        csr: CSRGraph
+        s, t: 출발/도착 노드 인덱스
+        heuristic: 노드 인덱스별 도착지까지의 하한 거리 표 (없으면 Dijkstra)
+        start_time: 실행시간 측정 시작 시각 (휴리스틱 준비 시간 포함용)
+
+    Returns:
+        tuple: (OSM 노드 경로, 거리, 실행시간(초), 탐색 노드 수)
+    """
+    offsets, targets, weights = csr.lists()
+    n = csr.num_nodes
+
+    if start_time is None:
+        start_time = time.time()
+
+    dist = [math.inf] * n
+    pred = [-1] * n
+    settled = bytearray(n)
+
+    dist[s] = 0
+    open_set = [(heuristic[s] if heuristic else 0, s)]
+    nodes_visited = 0
+
+    while open_set:
+        _, current = heapq.heappop(open_set)
+
+        if settled[current]:
+            continue
+
+        settled[current] = 1
+        nodes_visited += 1
+
+        # 목표 도달
+        if current == t:
+            path = _reconstruct(pred, s, t)
+            end_time = time.time()
+            return csr.to_node_ids(path), dist[t], end_time - start_time, nodes_visited
+
+        # 이웃 노드 완화
+        g = dist[current]
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[e]
+            new_g = g + weights[e]
+            if new_g < dist[neighbor]:
+                dist[neighbor] = new_g
+                pred[neighbor] = current
+                if heuristic:
+                    heapq.heappush(open_set, (new_g + heuristic[neighbor], neighbor))
+                else:
+                    heapq.heappush(open_set, (new_g, neighbor))
+
+    return None, None, None, None
+
+
+def _bidirectional_search(csr, s, t, potential=None, start_time=None):
+    """
+    양방향 탐색 커널 (potential이 없으면 양방향 Dijkstra)
+
+    정방향 키 = d_f(v) + p(v), 역방향 키 = d_b(v) - p(v)
+    지금까지 찾은 최단 경로 길이 mu에 대해 두 힙의 최소 키 합이 mu 이상이면 종료
+
+    Returns:
+        tuple: (OSM 노드 경로, 거리, 실행시간(초), 탐색 노드 수)
+    """
+    # 0: 정방향(s에서 출발), 1: 역방향(t에서 출발, 엣지를 뒤집은 그래프)
+    adjacency = (csr.lists(), csr.reverse().lists())
+
+    if start_time is None:
+        start_time = time.time()
+
+    if s == t:
+        return csr.to_node_ids([s]), 0, time.time() - start_time, 1
+
+    n = csr.num_nodes
+    p = potential if potential is not None else [0.0] * n
+
+    sign = (1, -1)
+    dist = ([math.inf] * n, [math.inf] * n)
+    pred = ([-1] * n, [-1] * n)
+    settled = (bytearray(n), bytearray(n))
+    heaps = ([(p[s], s)], [(-p[t], t)])
+
+    dist[0][s] = 0
+    dist[1][t] = 0
+
+    mu = math.inf
+    meeting = -1
+    nodes_visited = 0
+
+    while heaps[0] and heaps[1]:
+        # 이미 확정된 노드의 오래된 항목 제거
+        for side in (0, 1):
+            heap = heaps[side]
+            while heap and settled[side][heap[0][1]]:
+                heapq.heappop(heap)
+        if not heaps[0] or not heaps[1]:
+            break
+
+        # 종료 조건
+        if heaps[0][0][0] + heaps[1][0][0] >= mu:
+            break
+
+        # 최소 키가 작은 쪽을 확장
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        other = 1 - side
+
+        _, current = heapq.heappop(heaps[side])
+        settled[side][current] = 1
+        nodes_visited += 1
+
+        offsets, targets, weights = adjacency[side]
+        d, d_other, pr, sg = dist[side], dist[other], pred[side], sign[side]
+        g = d[current]
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[e]
+            new_g = g + weights[e]
+            if new_g < d[neighbor]:
+                d[neighbor] = new_g
+                pr[neighbor] = current
+                heapq.heappush(heaps[side], (new_g + sg * p[neighbor], neighbor))
+
+            # 반대편 탐색이 도달한 노드면 경로 후보 갱신
+            if d_other[neighbor] < math.inf and new_g + d_other[neighbor] < mu:
+                mu = new_g + d_other[neighbor]
+                meeting = neighbor
+
+    if meeting < 0:
+        return None, None, None, None
+
+    forward = _reconstruct(pred[0], s, meeting)
+    backward = _reconstruct(pred[1], t, meeting)
+    path = forward + backward[-2::-1]
+
+    end_time = time.time()
+    return csr.to_node_ids(path), mu, end_time - start_time, nodes_visited
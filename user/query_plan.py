@@ -0,0 +1,80 @@
+# user/query_plan.py
+
+from user.data import DTL_KDC
+
+# 가중 Reciprocal Rank Fusion 상수 (순위가 낮은 결과의 영향 완화)
+RRF_K = 60
+
+DTL_KDC_REVERSE = {v: k for k, v in DTL_KDC.items()}
+
+
+def plan_queries(user_prefs):
+    """
+    사용자 선호도 가중치를 loanItemSrch 질의 목록으로 변환
+
+    - 세부 장르를 고른 대분류: 장르별 dtl_kdc 질의 (대분류 가중치 × 장르 가중치)
+    - 세부 장르가 없는 대분류: kdc 질의 (대분류 가중치)
+
+    Args:
+        user_prefs: {"kdc": {"8": 0.5, ...}, "genre": {"한국문학": 0.5, ...}, ...}
+
+    Returns:
+        list: [(파라미터 dict, 가중치), ...] (가중치 합 1)
+    """
+    kdc_weights = user_prefs.get("kdc") or {}
+    genre_weights = user_prefs.get("genre") or {}
+
+    if isinstance(kdc_weights, str):
+        kdc_weights = {kdc_weights: 1.0}
+
+    # 장르 이름 → 세부 KDC 코드
+    dtl_weights = {}
+    for name, weight in genre_weights.items():
+        code = DTL_KDC_REVERSE.get(name)
+        if code:
+            dtl_weights[code] = dtl_weights.get(code, 0) + weight
+
+    queries = []
+    covered = set()
+    for code, weight in dtl_weights.items():
+        parent = code[0]
+        kdc_weight = kdc_weights.get(parent, 1.0 if not kdc_weights else 0)
+        if kdc_weight:
+            queries.append(({"dtl_kdc": code}, kdc_weight * weight))
+            covered.add(parent)
+
+    for code, weight in kdc_weights.items():
+        if code not in covered and weight:
+            queries.append(({"kdc": code}, weight))
+
+    if not queries:
+        return [({}, 1.0)]
+
+    total = sum(weight for _, weight in queries)
+    return [(params, weight / total) for params, weight in queries]
+
+
+def merge_ranked(results):
+    """
+    질의별 결과를 isbn13 기준으로 합치고 가중 점수로 정렬
+
+    점수 = Σ 가중치 / (RRF_K + 순위)
+
+    Args:
+        results: [(books, 가중치), ...] (books는 loanItemSrch docs 리스트)
+
+    Returns:
+        list: 점수 내림차순으로 정렬된 books
+    """
+    scores = {}
+    merged = {}
+
+    for books, weight in results:
+        for rank, book in enumerate(books, start=1):
+            doc = book.get("doc", {})
+            key = doc.get("isbn13") or doc.get("bookname") or id(book)
+            scores[key] = scores.get(key, 0) + weight / (RRF_K + rank)
+            merged.setdefault(key, book)
+
+    order = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [merged[key] for key in order]
@@ -1,6 +1,6 @@
 import streamlit as st
-import requests
 import data
+import http_client
 
 KAKAO_REST_API_KEY = "YOUR_KAKAO_KEY"  # 환경변수나 st.secrets로 관리 추천
 
@@ -19,7 +19,7 @@ def kakao_reverse_geocode(lat: float, lon: float):
         "y": lat,  # 위도
         "input_coord": "WGS84"
     }
-    res = requests.get(url, headers=headers, params=params)
+    res = http_client.get(url, headers=headers, params=params)
     res.raise_for_status()
     data = res.json()
     docs = data.get("documents", [])
@@ -96,7 +96,7 @@ if st.button("내 위치 기준 도서관 찾기"):
 
         api_url = "http://data4library.kr/api/libSrch"
         try:
-            r = requests.get(api_url, params=params)
+            r = http_client.get(api_url, params=params)
             r.raise_for_status()
             data = r.json()
         except Exception as e:
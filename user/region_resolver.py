@@ -0,0 +1,367 @@
+# user/region_resolver.py
+#
+# 좌표 → 정보나루 region / dtl_region 코드 (네트워크 없이)
+#
+# 행정구역 경계는 GeoJSON FeatureCollection 파일(BOUNDARY_PATH)에서 읽는다.
+# 각 Feature의 properties에는 "dtl_region"(예: "31011") 또는
+# "name"(예: "경기도 수원시 장안구", DTL_REGION 값과 동일) 중 하나가 있어야 한다.
+#
+# 경계 파일 만들기: python -m user.region_resolver <행정구역 경계.geojson> [--name-field adm_nm]
+#   공개 행정동/시군구 경계 GeoJSON의 주소 이름을 DTL_REGION에 맞춰 코드를 붙이고
+#   좌표를 단순화해 BOUNDARY_PATH에 저장한다.
+
+import argparse
+import json
+import math
+import os
+import threading
+
+from user.data import REGION, DTL_REGION
+
+BOUNDARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "boundaries", "dtl_region.geojson")
+
+DTL_REGION_REVERSE = {v: k for k, v in DTL_REGION.items()}
+REGION_REVERSE = {v: k for k, v in REGION.items()}
+
+# R-tree 노드당 최대 자식 수
+NODE_CAPACITY = 16
+
+# 경계 단순화 허용 오차 (도), 0.0002도 ≈ 20m
+SIMPLIFY_TOLERANCE_DEG = 0.0002
+
+# 경계 파일에 저장하는 좌표 소수 자릿수 (6자리 ≈ 0.1m)
+COORD_DECIMALS = 6
+
+
+class STRTree:
+    """
+    Sort-Tile-Recursive 방식으로 한 번에 적재하는 정적 R-tree
+
+    항목은 (min_x, min_y, max_x, max_y) 경계 상자와 임의의 값
+    """
+
+    def __init__(self, items, capacity=NODE_CAPACITY):
+        # 항목: (bbox, value, True), 노드: (bbox, children, False)
+        self.capacity = capacity
+        self.root = None
+
+        if not items:
+            return
+
+        level = self._pack([(bbox, value, True) for bbox, value in items])
+        while len(level) > 1:
+            level = self._pack(level)
+
+        self.root = level[0]
+
+    def _pack(self, entries):
+        capacity = self.capacity
+        slab_count = max(1, math.ceil(math.sqrt(math.ceil(len(entries) / capacity))))
+        slab_size = slab_count * capacity
+
+        entries = sorted(entries, key=lambda e: (e[0][0] + e[0][2]) / 2)
+        nodes = []
+        for i in range(0, len(entries), slab_size):
+            slab = sorted(entries[i:i + slab_size], key=lambda e: (e[0][1] + e[0][3]) / 2)
+            for j in range(0, len(slab), capacity):
+                group = slab[j:j + capacity]
+                bbox = (
+                    min(e[0][0] for e in group),
+                    min(e[0][1] for e in group),
+                    max(e[0][2] for e in group),
+                    max(e[0][3] for e in group),
+                )
+                nodes.append((bbox, group, False))
+        return nodes
+
+    def query_point(self, x, y):
+        """점을 포함하는 경계 상자의 값 목록"""
+        if self.root is None:
+            return []
+
+        found = []
+        stack = [self.root]
+        while stack:
+            bbox, children, is_leaf = stack.pop()
+            if not (bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]):
+                continue
+            if is_leaf:
+                found.append(children)
+            else:
+                stack.extend(children)
+        return found
+
+
+def _point_in_ring(x, y, ring):
+    # ray casting
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _point_in_polygon(x, y, polygon):
+    # polygon: [외곽 링, 구멍 링...]
+    if not _point_in_ring(x, y, polygon[0]):
+        return False
+    return not any(_point_in_ring(x, y, hole) for hole in polygon[1:])
+
+
+def _ring_area(ring):
+    area = 0.0
+    for i in range(len(ring) - 1):
+        area += ring[i][0] * ring[i + 1][1] - ring[i + 1][0] * ring[i][1]
+    return abs(area) / 2
+
+
+class RegionResolver:
+    """행정구역 경계 폴리곤 + STR R-tree 기반 좌표 → 지역 코드 변환기"""
+
+    def __init__(self, features):
+        items = []
+        for feature in features:
+            code = self._feature_code(feature.get("properties", {}))
+            geometry = feature.get("geometry") or {}
+            if not code:
+                continue
+
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+
+            for polygon in polygons:
+                xs = [p[0] for p in polygon[0]]
+                ys = [p[1] for p in polygon[0]]
+                bbox = (min(xs), min(ys), max(xs), max(ys))
+                items.append((bbox, (code, polygon, _ring_area(polygon[0]))))
+
+        self.tree = STRTree(items)
+        self.size = len(items)
+
+    @staticmethod
+    def _feature_code(properties):
+        code = str(properties.get("dtl_region", "") or "")
+        if code in DTL_REGION:
+            return code
+        return DTL_REGION_REVERSE.get(properties.get("name"))
+
+    @classmethod
+    def from_geojson(cls, path=BOUNDARY_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f).get("features", []))
+
+    def resolve(self, lat, lon):
+        """
+        좌표가 속한 행정구역 코드
+
+        시와 구 경계가 모두 있으면 더 작은(구) 폴리곤을 우선
+
+        Returns:
+            tuple: (region, dtl_region) 또는 (None, None)
+        """
+        matches = [
+            (area, code)
+            for code, polygon, area in self.tree.query_point(lon, lat)
+            if _point_in_polygon(lon, lat, polygon)
+        ]
+        if not matches:
+            return None, None
+
+        _, dtl_region = min(matches)
+        return dtl_region[:2], dtl_region
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+_missing_logged = False
+
+
+def get_resolver(path=BOUNDARY_PATH):
+    """경계 파일이 있으면 공용 RegionResolver, 없으면 None (없다는 안내는 한 번만 출력)"""
+    global _resolver, _missing_logged
+    if _resolver is None:
+        if not os.path.exists(path):
+            if not _missing_logged:
+                _missing_logged = True
+                print(f"행정구역 경계 파일 없음 ({path}), 카카오 역지오코딩으로 대체합니다. "
+                      "python -m user.region_resolver 로 만들 수 있습니다.")
+            return None
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = RegionResolver.from_geojson(path)
+    return _resolver
+
+
+def resolve_region_codes(lat, lon):
+    """
+    좌표 → (region, dtl_region) 코드 (오프라인)
+
+    Returns:
+        tuple: (region, dtl_region), 경계 파일이 없거나 찾지 못하면 (None, None)
+    """
+    resolver = get_resolver()
+    if resolver is None:
+        return None, None
+    return resolver.resolve(lat, lon)
+
+
+def address_to_region_codes(address):
+    """
+    카카오 주소 문자열 → (region, dtl_region) 코드
+
+    주소 단어 수와 관계없이 DTL_REGION 이름 중 가장 긴 접두어로 매칭
+    (예: "경기도 수원시 장안구 파장동" → 31011)
+
+    Returns:
+        tuple: (region, dtl_region), 찾지 못한 값은 None
+    """
+    if not address:
+        return None, None
+
+    parts = address.split()
+    for n in range(len(parts), 0, -1):
+        dtl_region = DTL_REGION_REVERSE.get(" ".join(parts[:n]))
+        if dtl_region:
+            return dtl_region[:2], dtl_region
+
+    return REGION_REVERSE.get(parts[0]), None
+
+
+def _simplify(points, tolerance):
+    """Douglas-Peucker 선 단순화 (양 끝점 유지)"""
+    if len(points) < 3:
+        return points
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = points[first][0], points[first][1]
+        x2, y2 = points[last][0], points[last][1]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+
+        farthest, max_dist = None, tolerance
+        for i in range(first + 1, last):
+            px, py = points[i][0], points[i][1]
+            if length == 0:
+                dist = math.hypot(px - x1, py - y1)
+            else:
+                dist = abs(dy * (px - x1) - dx * (py - y1)) / length
+            if dist > max_dist:
+                farthest, max_dist = i, dist
+
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+def _simplify_ring(ring, tolerance):
+    """닫힌 링 단순화 (너무 줄어들면 원래 링 사용), 좌표는 COORD_DECIMALS 자리로 반올림"""
+    simplified = _simplify(ring, tolerance)
+    if len(simplified) < 4:
+        simplified = ring
+    return [[round(p[0], COORD_DECIMALS), round(p[1], COORD_DECIMALS)] for p in simplified]
+
+
+def _match_dtl_region(name, compact_names):
+    """
+    주소 이름 → 세부 지역 코드
+
+    "경기도 수원시장안구 파장동"처럼 띄어쓰기가 DTL_REGION과 달라도 맞도록
+    공백을 뺀 이름으로 가장 긴 접두어를 찾는다.
+    """
+    _, dtl_region = address_to_region_codes(name)
+    if dtl_region:
+        return dtl_region
+
+    compact = name.replace(" ", "")
+    for region_name, code in compact_names:
+        if compact.startswith(region_name):
+            return code
+    return None
+
+
+def build_boundaries(source_path, output_path=BOUNDARY_PATH, name_fields=("adm_nm",), tolerance=SIMPLIFY_TOLERANCE_DEG):
+    """
+    공개 행정구역 경계 GeoJSON → RegionResolver용 경계 파일
+
+    Args:
+        source_path: 행정동 또는 시군구 경계 GeoJSON (WGS84 경위도)
+        output_path: 저장 경로
+        name_fields: 주소 이름을 만드는 속성 (순서대로 공백으로 이어 붙임, 예: ("sidonm", "sggnm"))
+        tolerance: 단순화 허용 오차 (도)
+
+    Returns:
+        tuple: (저장한 Feature 수, 지역 코드를 찾지 못한 Feature 수)
+    """
+    compact_names = sorted(
+        ((name.replace(" ", ""), code) for name, code in DTL_REGION_REVERSE.items()),
+        key=lambda item: -len(item[0]),
+    )
+
+    with open(source_path, encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+
+    output = []
+    unmatched = 0
+    for feature in features:
+        properties = feature.get("properties") or {}
+        geometry = feature.get("geometry") or {}
+        name = " ".join(str(properties[field]) for field in name_fields if properties.get(field))
+        code = _match_dtl_region(name, compact_names) if name else None
+        if code is None:
+            unmatched += 1
+            continue
+
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            unmatched += 1
+            continue
+
+        output.append({
+            "type": "Feature",
+            "properties": {"dtl_region": code},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [[_simplify_ring(ring, tolerance) for ring in polygon] for polygon in polygons],
+            },
+        })
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": output}, f, ensure_ascii=False, separators=(",", ":"))
+
+    return len(output), unmatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="행정구역 경계 GeoJSON으로 오프라인 지역 코드 경계 파일 생성")
+    parser.add_argument("source", help="행정동/시군구 경계 GeoJSON (WGS84)")
+    parser.add_argument("--name-field", nargs="+", default=["adm_nm"],
+                        help="주소 이름 속성 (여러 개면 공백으로 이어 붙임, 예: sidonm sggnm)")
+    parser.add_argument("--tolerance", type=float, default=SIMPLIFY_TOLERANCE_DEG, help="단순화 허용 오차 (도)")
+    parser.add_argument("--output", default=BOUNDARY_PATH, help="저장 경로")
+    args = parser.parse_args()
+
+    count, unmatched = build_boundaries(args.source, args.output, args.name_field, args.tolerance)
+    print(f"경계 {count}개 저장 ({args.output}), 지역 코드 미일치 {unmatched}개")
+
+
+if __name__ == "__main__":
+    main()
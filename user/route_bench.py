@@ -0,0 +1,325 @@
+# user/route_bench.py
+#
+# 경로 탐색 벤치마크 (Streamlit 없이 실행)
+#
+# 사용:
+#   python -m user.route_bench                                   # 로컬 Overpass 그래프 + 격자 50/100/200
+#   python -m user.route_bench --graphs overpass --pairs 500 --output bench.json
+#   python -m user.route_bench --graphs grid --scales 100 --engines astar alt ch
+#
+# 같은 시드면 같은 그래프와 같은 출발/도착 쌍을 사용한다. 지연 시간은 perf_counter로 따로 재고,
+# 메모리 최대치는 tracemalloc 오버헤드가 지연 시간에 섞이지 않도록 일부 쌍으로 별도 측정한다.
+# networkx Dijkstra 결과를 기준으로 각 엔진의 경로 길이 일치 여부를 확인한다.
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+
+from user.contraction import build_hierarchy, ch_path
+from user.csr_graph import CSRGraph
+from user.graph_cache import arrays_to_graph
+from user.landmarks import build_landmarks
+from user.map import calculate_distance
+from user.pathfinding import (
+    alt_path, astar_path, bidirectional_astar_path, bidirectional_dijkstra_path, dijkstra_path,
+)
+
+ENGINES = [
+    "astar", "dijkstra", "bidirectional_astar", "bidirectional_dijkstra",
+    "networkx_dijkstra", "networkx_astar", "alt", "ch",
+]
+# 전처리가 오래 걸리는 엔진은 기본 목록에서 제외
+DEFAULT_ENGINES = ENGINES[:6]
+DEFAULT_SCALES = [50, 100, 200]
+
+# 메모리 측정에 쓰는 쌍 수
+MEMORY_PAIRS = 20
+
+# 경로 길이 일치 허용 오차 (미터): float32 엣지 길이 합산 순서 차이
+PARITY_TOLERANCE_M = 0.01
+
+# 격자 노드 간격 (도), 약 100m
+GRID_SPACING_DEG = 0.001
+
+
+def grid_arrays(n, seed=0, origin=(37.5, 127.0)):
+    """
+    n × n 격자 보행 그래프 (graph_cache.graph_to_arrays 형식)
+
+    엣지 길이는 대원 거리에 1.0~1.3배 우회 계수를 곱해 A* 휴리스틱이 admissible하게 유지하고
+    엣지 10%를 지워 막힌 길을 흉내 낸다 (양방향 쌍 단위).
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = np.divmod(np.arange(n * n), n)
+    y = origin[0] + rows * GRID_SPACING_DEG
+    x = origin[1] + cols * GRID_SPACING_DEG
+
+    index = np.arange(n * n).reshape(n, n)
+    right = np.stack([index[:, :-1].ravel(), index[:, 1:].ravel()], axis=1)
+    down = np.stack([index[:-1, :].ravel(), index[1:, :].ravel()], axis=1)
+    pairs = np.concatenate([right, down])
+    pairs = pairs[rng.random(len(pairs)) >= 0.1]
+
+    u, v = pairs[:, 0], pairs[:, 1]
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (y[u], x[u], y[v], x[v]))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    length = 2 * 6371009 * np.arcsin(np.sqrt(a)) * rng.uniform(1.0, 1.3, len(pairs))
+
+    return {
+        "node_ids": np.arange(n * n, dtype=np.int64) + 1,
+        "x": x,
+        "y": y,
+        "edge_u": np.concatenate([u, v]).astype(np.int32),
+        "edge_v": np.concatenate([v, u]).astype(np.int32),
+        "edge_length": np.concatenate([length, length]).astype(np.float32),
+    }
+
+
+def load_graphs(sources, scales, seed):
+    """(이름, 배열) 목록"""
+    graphs = []
+    if "overpass" in sources:
+        from user.overpass_graph import build_walk_arrays, overpass_files
+
+        files = overpass_files()
+        if files:
+            graphs.append(("overpass", build_walk_arrays(files)))
+        else:
+            print("cache/*.json Overpass 파일이 없어 건너뜀", file=sys.stderr)
+    if "grid" in sources:
+        graphs.extend((f"grid{n}", grid_arrays(n, seed)) for n in scales)
+    return graphs
+
+
+def sample_pairs(G, count, seed):
+    """networkx Dijkstra로 서로 도달 가능한 (출발, 도착, 기준 거리) 쌍"""
+    rng = random.Random(seed)
+    nodes = sorted(G.nodes)
+    pairs = []
+    attempts = 0
+    while len(pairs) < count and attempts < count * 20:
+        attempts += 1
+        s, t = rng.choice(nodes), rng.choice(nodes)
+        if s == t:
+            continue
+        try:
+            dist = nx.shortest_path_length(G, s, t, weight="length")
+        except nx.NetworkXNoPath:
+            continue
+        pairs.append((s, t, dist))
+    return pairs
+
+
+def _networkx_engines(G):
+    coords = {node: (data["y"], data["x"]) for node, data in G.nodes(data=True)}
+
+    def heuristic(a, b):
+        return calculate_distance(*coords[a], *coords[b])
+
+    def networkx_dijkstra(s, t):
+        dist, path = nx.single_source_dijkstra(G, s, t, weight="length")
+        return path, dist, None
+
+    def networkx_astar(s, t):
+        path = nx.astar_path(G, s, t, heuristic=heuristic, weight="length")
+        return path, nx.path_weight(G, path, "length"), None
+
+    return {"networkx_dijkstra": networkx_dijkstra, "networkx_astar": networkx_astar}
+
+
+def build_engines(csr, G, selected):
+    """
+    엔진 이름 → fn(s, t) → (경로, 거리, 탐색 노드 수)
+
+    Returns:
+        tuple: (엔진 dict, {전처리 이름: 초})
+    """
+    preprocessing = {}
+    engines = {}
+
+    def wrap(search, **kwargs):
+        def run(s, t):
+            path, dist, _, nodes = search(csr, s, t, **kwargs)
+            return path, dist, nodes
+        return run
+
+    for name, search in (
+        ("astar", astar_path),
+        ("dijkstra", dijkstra_path),
+        ("bidirectional_astar", bidirectional_astar_path),
+        ("bidirectional_dijkstra", bidirectional_dijkstra_path),
+    ):
+        if name in selected:
+            engines[name] = wrap(search)
+
+    for name, run in _networkx_engines(G).items():
+        if name in selected:
+            engines[name] = run
+
+    if "alt" in selected:
+        start = time.perf_counter()
+        landmarks = build_landmarks(csr)
+        preprocessing["alt_s"] = round(time.perf_counter() - start, 3)
+        engines["alt"] = wrap(alt_path, landmarks=landmarks)
+
+    if "ch" in selected:
+        start = time.perf_counter()
+        hierarchy = build_hierarchy(csr)
+        preprocessing["ch_s"] = round(time.perf_counter() - start, 3)
+        preprocessing["ch_shortcuts"] = hierarchy.num_shortcuts
+        engines["ch"] = wrap(ch_path, hierarchy=hierarchy)
+
+    return engines, preprocessing
+
+
+def _path_length(edge_weights, path):
+    """반환된 경로를 실제 엣지로 다시 합산 (존재하지 않는 엣지가 있으면 inf)"""
+    return sum(edge_weights.get(pair, math.inf) for pair in zip(path, path[1:]))
+
+
+def _summary(values):
+    if not values:
+        return None
+    arr = np.asarray(values, dtype=np.float64)
+    return {
+        "p50": round(float(np.percentile(arr, 50)), 4),
+        "p95": round(float(np.percentile(arr, 95)), 4),
+        "p99": round(float(np.percentile(arr, 99)), 4),
+        "mean": round(float(arr.mean()), 4),
+    }
+
+
+def bench_engine(run, pairs, edge_weights):
+    latencies, settled = [], []
+    mismatches, failures = 0, 0
+    max_error = 0.0
+
+    for s, t, reference in pairs:
+        start = time.perf_counter()
+        path, dist, nodes = run(s, t)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if path is None:
+            failures += 1
+            continue
+        if nodes is not None:
+            settled.append(nodes)
+
+        error = max(abs(dist - reference), abs(_path_length(edge_weights, path) - reference))
+        max_error = max(max_error, error)
+        if error > PARITY_TOLERANCE_M or path[0] != s or path[-1] != t:
+            mismatches += 1
+
+    # 메모리 최대치 (탐색 중 새로 할당한 양)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for s, t, _ in pairs[:MEMORY_PAIRS]:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            run(s, t)
+            peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "latency_ms": _summary(latencies),
+        "nodes_settled": _summary(settled),
+        "peak_memory_kb": _summary(peaks),
+        "parity": {
+            "checked": len(pairs) - failures,
+            "mismatches": mismatches,
+            "not_found": failures,
+            "max_abs_error_m": round(max_error, 6),
+        },
+    }
+
+
+def run_benchmark(sources=("overpass", "grid"), scales=DEFAULT_SCALES, engines=DEFAULT_ENGINES,
+                  pairs=100, seed=0, warmup=3):
+    """
+    전체 벤치마크 실행
+
+    Returns:
+        dict: JSON으로 저장할 결과
+    """
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "pairs": pairs,
+            "engines": list(engines),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "networkx": nx.__version__,
+            "platform": platform.platform(),
+        },
+        "graphs": [],
+    }
+
+    for name, arrays in load_graphs(sources, scales, seed):
+        csr = CSRGraph.from_arrays(
+            arrays["node_ids"], arrays["x"], arrays["y"],
+            arrays["edge_u"], arrays["edge_v"], arrays["edge_length"],
+        )
+        G = arrays_to_graph(arrays)
+        od_pairs = sample_pairs(G, pairs, seed)
+
+        edge_weights = {}
+        node_ids = csr.node_ids.tolist()
+        for u, v, w in zip(csr.sources().tolist(), csr.targets.tolist(), csr.weights.tolist()):
+            key = (node_ids[u], node_ids[v])
+            edge_weights[key] = min(edge_weights.get(key, math.inf), w)
+
+        engine_funcs, preprocessing = build_engines(csr, G, engines)
+
+        results = {}
+        for engine, run in engine_funcs.items():
+            # 첫 호출의 리스트 변환·역방향 그래프 생성 등은 측정에서 제외
+            for s, t, _ in od_pairs[:warmup]:
+                run(s, t)
+            results[engine] = bench_engine(run, od_pairs, edge_weights)
+            print(f"{name} {engine}: p50 {results[engine]['latency_ms']['p50']}ms", file=sys.stderr)
+
+        report["graphs"].append({
+            "name": name,
+            "nodes": csr.num_nodes,
+            "edges": csr.num_edges,
+            "pairs": len(od_pairs),
+            "preprocessing": preprocessing,
+            "engines": results,
+        })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경로 탐색 엔진 벤치마크")
+    parser.add_argument("--graphs", nargs="+", choices=("overpass", "grid"), default=["overpass", "grid"])
+    parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES, help="격자 한 변 노드 수")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=DEFAULT_ENGINES)
+    parser.add_argument("--pairs", type=int, default=100, help="그래프별 출발/도착 쌍 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.graphs, args.scales, args.engines, args.pairs, args.seed)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# user/route_cache.py
+#
+# 경로 탐색 결과 캐시 (모든 Streamlit 세션이 공유)
+#
+# 키: (graph_id, 출발 노드, 도착 노드, 알고리즘, 가중치)
+# 값: 노드 경로, 거리, 지도용 좌표 목록 (+ 처음 탐색할 때의 실행시간, 탐색 노드 수)
+# 같은 그래프에서 같은 노드 쌍을 다시 찾으면 탐색과 좌표 추출을 모두 건너뛴다.
+
+import os
+import threading
+
+from user.graph_cache import MemoryLRU
+
+# 경로 캐시 메모리 예산 (바이트)
+ROUTE_CACHE_MAX_BYTES = int(os.getenv("ROUTE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+
+def route_key(graph_id, start_node, end_node, algorithm, weight="length"):
+    return graph_id, int(start_node), int(end_node), algorithm, weight
+
+
+def estimate_route_bytes(route):
+    # 노드 ID(int) 약 36바이트, 좌표 튜플(float 2개) 약 120바이트
+    return len(route["path"]) * 36 + len(route["coords"]) * 120 + 200
+
+
+class RouteCache:
+    """메모리 예산으로 제한되는 경로 LRU + 적중/미스 집계"""
+
+    def __init__(self, max_bytes=ROUTE_CACHE_MAX_BYTES):
+        self._lru = MemoryLRU(max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        저장된 경로 (없으면 None)
+
+        Returns:
+            dict: {"path", "distance", "coords", "compute_time", "nodes_explored"}
+        """
+        route = self._lru.get(key)
+        with self._lock:
+            if route is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return route
+
+    def put(self, key, route):
+        self._lru.put(key, route, estimate_route_bytes(route))
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": len(self._lru),
+            "used_bytes": self._lru.used_bytes,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+route_cache = RouteCache()
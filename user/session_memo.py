@@ -0,0 +1,41 @@
+# user/session_memo.py
+
+import json
+
+import streamlit as st
+
+
+def session_memo(namespace, inputs, compute):
+    """
+    세션 범위 메모이제이션
+
+    같은 세션에서 inputs가 이전 실행과 같으면 compute()를 다시 호출하지 않고
+    저장된 값을 반환 (정렬/표시 개수 변경 등 UI 재실행 시 I/O 생략)
+
+    Args:
+        namespace: 저장 이름 (namespace별로 가장 최근 입력 1개만 보관)
+        inputs: 결과를 결정하는 입력값 (JSON 직렬화 가능)
+        compute: 인자 없는 계산 함수
+
+    Returns:
+        compute()의 결과 (저장된 값 또는 새로 계산한 값)
+    """
+    memo = st.session_state.setdefault("_memo", {})
+    key = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+
+    entry = memo.get(namespace)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+
+    value = compute()
+    memo[namespace] = (key, value)
+    return value
+
+
+def clear_session_memo(namespace=None):
+    """저장된 값 삭제 (namespace가 없으면 전체)"""
+    memo = st.session_state.get("_memo", {})
+    if namespace is None:
+        memo.clear()
+    else:
+        memo.pop(namespace, None)
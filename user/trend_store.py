@@ -0,0 +1,234 @@
+# user/trend_store.py
+#
+# 정보나루 인기대출도서(loanItemSrch) 오프라인 스냅샷 저장소
+#
+# 수집: python -m user.trend_store            (NARU_API_KEY 필요)
+#       python -m user.trend_store --record fixture.json   (응답을 픽스처로 기록)
+#       python -m user.trend_store --fixture fixture.json  (기록된 픽스처로 재생)
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from user.data import GENDER, AGE, KDC, DTL_KDC
+
+DEFAULT_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "cache",
+    "trend_store.sqlite3",
+)
+
+# 프로필별로 보관할 상위 도서 수
+DEFAULT_TOP_K = 100
+
+LOAN_ITEM_URL = "http://data4library.kr/api/loanItemSrch"
+
+
+def profile_key(gender=None, age=None, kdc=None, dtl_kdc=None):
+    """(성별, 연령, KDC, 세부 KDC) 조합을 저장소 키로 변환"""
+    return "|".join(str(v) if v not in (None, "") else "" for v in (gender, age, kdc, dtl_kdc))
+
+
+def iter_profiles():
+    """user/data.py의 성별 × 연령 × (KDC / 세부 KDC) 전체 조합"""
+    for gender in GENDER:
+        for age in AGE:
+            for kdc in KDC:
+                yield {"gender": gender, "age": age, "kdc": kdc}
+            for dtl_kdc in DTL_KDC:
+                yield {"gender": gender, "age": age, "dtl_kdc": dtl_kdc}
+
+
+class TrendStore:
+    """
+    프로필별 상위 K권을 미리 계산해 두는 SQLite 저장소
+
+    books 테이블의 (profile_key, rank) 기본 키가 프로필별 top-K 인덱스 역할을 함
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    profile_key TEXT PRIMARY KEY,
+                    start_dt TEXT NOT NULL,
+                    end_dt TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS books (
+                    profile_key TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    isbn13 TEXT,
+                    doc TEXT NOT NULL,
+                    PRIMARY KEY (profile_key, rank)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def save(self, key, books, start_dt, end_dt, top_k=DEFAULT_TOP_K):
+        """프로필 스냅샷 교체 저장 (상위 top_k권만)"""
+        rows = [
+            (key, rank, book.get("doc", {}).get("isbn13"), json.dumps(book, ensure_ascii=False))
+            for rank, book in enumerate(books[:top_k], start=1)
+        ]
+
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM books WHERE profile_key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO books (profile_key, rank, isbn13, doc) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (profile_key, start_dt, end_dt, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, start_dt, end_dt, time.time()),
+            )
+
+    def lookup(self, key, page_no=1, page_size=20, max_age=None):
+        """
+        저장된 스냅샷에서 페이지 조회
+
+        Args:
+            key: profile_key()로 만든 키
+            page_no: 페이지 번호 (1부터)
+            page_size: 페이지 크기
+            max_age: 허용할 최대 스냅샷 나이 (초), None이면 제한 없음
+
+        Returns:
+            list: loanItemSrch docs 형식의 도서 리스트, 스냅샷이 없거나 오래됐으면 None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM snapshots WHERE profile_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if max_age is not None and time.time() - row[0] > max_age:
+                return None
+
+            first = (page_no - 1) * page_size + 1
+            docs = conn.execute(
+                "SELECT doc FROM books WHERE profile_key = ? AND rank BETWEEN ? AND ? ORDER BY rank",
+                (key, first, first + page_size - 1),
+            ).fetchall()
+
+        return [json.loads(doc) for (doc,) in docs]
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_trend_store():
+    """앱에서 쓰는 공용 TrendStore (Streamlit 재실행·세션 간 같은 인스턴스)"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = TrendStore()
+    return _shared_store
+
+
+def naru_fetcher(auth_key):
+    """정보나루 API를 호출하는 조회 함수 (params -> docs)"""
+    from user import http_client
+
+    def fetch(params):
+        response = http_client.get(LOAN_ITEM_URL, params={"authKey": auth_key, "format": "json", **params}, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("response", {}).get("docs", [])
+
+    return fetch
+
+
+def fixture_fetcher(path):
+    """기록된 픽스처 파일({profile_key: docs})을 재생하는 조회 함수 (테스트용)"""
+    with open(path, encoding="utf-8") as f:
+        recorded = json.load(f)
+
+    def fetch(params):
+        key = profile_key(params.get("gender"), params.get("age"), params.get("kdc"), params.get("dtl_kdc"))
+        return recorded.get(key, [])
+
+    return fetch
+
+
+def ingest(store, fetch, profiles=None, top_k=DEFAULT_TOP_K, days=30, record=None):
+    """
+    모든 프로필 조합의 최근 대출 순위를 받아 저장소에 적재
+
+    Args:
+        store: TrendStore
+        fetch: params -> docs 조회 함수
+        profiles: 수집할 프로필 목록 (None이면 전체 조합)
+        top_k: 프로필별 보관할 도서 수
+        days: 집계 기간 (일)
+        record: 응답을 기록할 dict (픽스처 생성용, 선택)
+
+    Returns:
+        int: 적재한 프로필 수
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    start_dt = start_date.strftime("%Y-%m-%d")
+    end_dt = end_date.strftime("%Y-%m-%d")
+
+    count = 0
+    for profile in profiles or iter_profiles():
+        params = dict(profile, startDt=start_dt, endDt=end_dt, pageNo=1, pageSize=top_k)
+        try:
+            docs = fetch(params)
+        except Exception as e:
+            print(f"수집 실패 {profile}: {e}")
+            continue
+
+        key = profile_key(profile.get("gender"), profile.get("age"), profile.get("kdc"), profile.get("dtl_kdc"))
+        store.save(key, docs, start_dt, end_dt, top_k=top_k)
+        if record is not None:
+            record[key] = docs
+        count += 1
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정보나루 인기대출도서 스냅샷 수집")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="저장소 경로")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="프로필별 보관 도서 수")
+    parser.add_argument("--fixture", help="API 대신 재생할 픽스처 파일")
+    parser.add_argument("--record", help="수집한 응답을 픽스처 파일로 기록")
+    args = parser.parse_args()
+
+    if args.fixture:
+        fetch = fixture_fetcher(args.fixture)
+    else:
+        from config import NARU_API_KEY
+        fetch = naru_fetcher(NARU_API_KEY)
+
+    record = {} if args.record else None
+    count = ingest(TrendStore(args.store), fetch, top_k=args.top_k, record=record)
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+
+    print(f"{count}개 프로필 적재 완료")
+
+
+if __name__ == "__main__":
+    main()
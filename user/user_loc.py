@@ -1,6 +1,20 @@
 import streamlit as st
 from streamlit_geolocation import streamlit_geolocation
-import requests
+import os
+from user import http_client
+from user import geohash
+from user.api_cache import CACHE_DIR, ResponseCache, make_cache_key
+from config import GEOCODE_PRECISION, GEOCODE_TTL
+
+# 역지오코딩 캐시: 같은 geohash 셀의 좌표는 한 번만 조회 (세션 간 공유)
+GEOCODE_TIMEOUT = 5
+
+_geocode_cache = ResponseCache(
+    path=os.path.join(CACHE_DIR, "geocode_cache.sqlite3"),
+    ttl=GEOCODE_TTL,
+    stale_ttl=0,
+    max_bytes=5 * 1024 * 1024,
+)
 
 # 방법 1: streamlit-geolocation 라이브러리 사용 (안정적!)
 def get_user_location():
@@ -16,30 +30,35 @@ def get_user_location():
         'accuracy': location.get('accuracy', 0),
         'timestamp': location.get('timestamp', '')
     }
-def get_address_name(lat, lon, kakao_api_key):
-    url = "https://dapi.kakao.com/v2/local/geo/coord2regioncode.json"
-    params = {"x": lon, "y": lat}
-    headers = {"Authorization": f"KakaoAK {kakao_api_key}"}
+def get_address_name(lat, lon, kakao_api_key, precision=None):
+    """좌표 → 행정동 주소 (geohash 셀 단위 캐시)"""
+    cell = geohash.encode(lat, lon, precision or GEOCODE_PRECISION)
+    cache_key = make_cache_key("coord2regioncode", {"geohash": cell})
 
-    res = requests.get(url, params=params, headers=headers)
-    res.raise_for_status()
+    def fetch():
+        url = "https://dapi.kakao.com/v2/local/geo/coord2regioncode.json"
+        params = {"x": lon, "y": lat}
+        headers = {"Authorization": f"KakaoAK {kakao_api_key}"}
 
-    docs = res.json().get("documents", [])
-    for doc in docs:
-        if doc.get("region_type") == "H":
-            return doc.get("address_name")
+        res = http_client.get(url, params=params, headers=headers, timeout=GEOCODE_TIMEOUT)
+        res.raise_for_status()
 
-    return None
+        docs = res.json().get("documents", [])
+        for doc in docs:
+            if doc.get("region_type") == "H":
+                return doc.get("address_name")
+
+        return None
+
+    return _geocode_cache.get_or_fetch(cache_key, fetch)
 
 
 # 방법 2: IP 기반 위치 (가장 안정적!)
 def get_location_from_ip():
     """IP 주소로 대략적인 위치 파악"""
-    import requests
-
     try:
         # ipapi.co 사용 (무료, 일 1000회 제한)
-        response = requests.get('https://ipapi.co/json/', timeout=5)
+        response = http_client.get('https://ipapi.co/json/', timeout=5)
         data = response.json()
 
         return {
@@ -1,3 +1,5 @@
+import numpy as np
+
 user_vector = {
     "gender": {
         "M": 1.0,
@@ -35,6 +37,107 @@ def recommendation_score(user, book):
     )
     return score
 
+class BookColumns:
+    """
+    후보 도서를 컬럼(NumPy 배열) 형태로 보관
+
+    kdc / genre는 어휘(vocab) 인덱스로, 성별 비율은 (도서 수 × 성별 키) 행렬로 저장
+    (도서에 없는 성별 키는 NaN)
+    """
+
+    def __init__(self, kdc_vocab, kdc_codes, genre_vocab, genre_codes, from_age, to_age, gender_keys, gender_ratio):
+        self.kdc_vocab = kdc_vocab
+        self.kdc_codes = kdc_codes
+        self.genre_vocab = genre_vocab
+        self.genre_codes = genre_codes
+        self.from_age = from_age
+        self.to_age = to_age
+        self.gender_keys = gender_keys
+        self.gender_ratio = gender_ratio
+
+    def __len__(self):
+        return len(self.kdc_codes)
+
+    @classmethod
+    def from_books(cls, books):
+        """recommendation_score가 받는 도서 dict 리스트로부터 생성"""
+        kdc_vocab, kdc_codes = _factorize([book["kdc"] for book in books])
+        genre_vocab, genre_codes = _factorize([book["genre"] for book in books])
+
+        gender_keys = sorted({key for book in books for key in book["gender_ratio"]})
+        gender_index = {key: i for i, key in enumerate(gender_keys)}
+        gender_ratio = np.full((len(books), len(gender_keys)), np.nan)
+        for row, book in enumerate(books):
+            for key, ratio in book["gender_ratio"].items():
+                gender_ratio[row, gender_index[key]] = ratio
+
+        return cls(
+            kdc_vocab,
+            kdc_codes,
+            genre_vocab,
+            genre_codes,
+            np.array([book["from_age"] for book in books], dtype=np.float64),
+            np.array([book["to_age"] for book in books], dtype=np.float64),
+            gender_keys,
+            gender_ratio,
+        )
+
+
+def _factorize(values):
+    vocab = list(dict.fromkeys(values))
+    index = {value: i for i, value in enumerate(vocab)}
+    return vocab, np.array([index[value] for value in values], dtype=np.int32)
+
+
+def batch_recommendation_scores(user, columns):
+    """
+    recommendation_score를 모든 후보 도서에 대해 한 번에 계산
+
+    Args:
+        user: 사용자 벡터
+        columns: BookColumns
+
+    Returns:
+        np.ndarray: 도서별 점수 (columns 순서)
+    """
+    kdc_weights = np.array([user["kdc"].get(code, 0) for code in columns.kdc_vocab], dtype=np.float64)
+    genre_weights = np.array([user["genre"].get(code, 0) for code in columns.genre_vocab], dtype=np.float64)
+
+    kdc_score = kdc_weights[columns.kdc_codes] if len(columns) else np.zeros(0)
+    genre_score = genre_weights[columns.genre_codes] if len(columns) else np.zeros(0)
+    age_match = ((columns.from_age <= user["age"]) & (user["age"] <= columns.to_age)).astype(np.float64)
+
+    if user["gender"] in columns.gender_keys:
+        ratio = columns.gender_ratio[:, columns.gender_keys.index(user["gender"])]
+        gender_match = np.where(np.isnan(ratio), 0.5, ratio)
+    else:
+        gender_match = np.full(len(columns), 0.5)
+
+    return (
+        0.35 * kdc_score +
+        0.30 * genre_score +
+        0.20 * age_match +
+        0.15 * gender_match
+    )
+
+
+def top_k_books(user, columns, k):
+    """
+    점수 상위 k권 선택 (argpartition 후 k개만 정렬)
+
+    Returns:
+        tuple: (도서 인덱스 배열, 점수 배열) 점수 내림차순
+    """
+    scores = batch_recommendation_scores(user, columns)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return top, scores[top]
+
+
 selected_genres = ["한국소설", "에세이", "인문"]
 
 weight = 1 / len(selected_genres)